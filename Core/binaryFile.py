@@ -0,0 +1,183 @@
+"""
+Binary block file.
+
+    | magic (4) | version (uint32) | header size (uint64) | data offset (uint64) |
+    | json header (utf-8) | padding |
+    | block 0 | padding | block 1 | padding | ...
+
+The json header store the user data and the block table (dtype, shape and offset relative to data offset).
+Each block is aligned on kAlignment bytes and can be read with numpy.memmap.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+import traceback
+from pathlib import Path
+
+import numpy as np
+
+from ..Core.logger import log
+
+
+kMagic = b"HDRB"
+kVersion = 1
+kAlignment = 64
+kPreamble = struct.Struct("<4sIQQ")
+
+kData = "data"
+kBlocks = "blocks"
+kDtype = "dtype"
+kShape = "shape"
+kOffset = "offset"
+
+
+def _padding(size: int) -> int:
+    return (kAlignment - size % kAlignment) % kAlignment
+
+
+def is_binary(path: str | Path) -> bool:
+    """!@Brief Check if given file is a binary block file."""
+    try:
+        with open(path, "rb") as handle:
+            return handle.read(len(kMagic)) == kMagic
+    except OSError:
+        return False
+
+
+def _write_record(handle, data: dict, blocks: dict):
+    """!@Brief Write one record (preamble, json header and blocks) at current handle position."""
+    arrays = {}
+    table = {}
+    offset = 0
+    for name, array in blocks.items():
+        array = np.ascontiguousarray(array)
+        if array.dtype.byteorder == ">":
+            array = array.astype(array.dtype.newbyteorder("<"))
+        arrays[name] = array
+        table[name] = {kDtype: array.dtype.str, kShape: list(array.shape), kOffset: offset}
+        offset += array.nbytes + _padding(array.nbytes)
+
+    header = json.dumps({kData: data, kBlocks: table}).encode("utf-8")
+    data_offset = kPreamble.size + len(header)
+    data_offset += _padding(data_offset)
+
+    handle.write(kPreamble.pack(kMagic, kVersion, len(header), data_offset))
+    handle.write(header)
+    handle.write(b"\0" * (data_offset - kPreamble.size - len(header)))
+    for array in arrays.values():
+        handle.write(array.tobytes())
+        handle.write(b"\0" * _padding(array.nbytes))
+
+
+def write(path: str | Path, data: dict, blocks: dict) -> int:
+    """!@Brief Write json data and numpy blocks to file. Return file size."""
+    try:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as handle:
+            _write_record(handle, data, blocks)
+            size = handle.tell()
+        log.debug(f"File write: {path}")
+
+        return size
+    except Exception:
+        log.debug(traceback.format_exc())
+        raise RuntimeError(f"Impossible to write binary file {path} !")
+
+
+def append(path: str | Path, data: dict, blocks: dict) -> int:
+    """!@Brief Append a new record at the end of file. Return file size."""
+    try:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "ab") as handle:
+            _write_record(handle, data, blocks)
+            size = handle.tell()
+        log.debug(f"File append: {path}")
+
+        return size
+    except Exception:
+        log.debug(traceback.format_exc())
+        raise RuntimeError(f"Impossible to append binary file {path} !")
+
+
+def _read_record_header(handle, start: int) -> tuple:
+    """!@Brief Read record header at start. Return (data, block table, absolute data offset, record end)."""
+    handle.seek(start)
+    magic, version, header_size, data_offset = kPreamble.unpack(handle.read(kPreamble.size))
+    if magic != kMagic:
+        raise RuntimeError(f"No binary record found at {start} !")
+    if version > kVersion:
+        raise RuntimeError(f"Binary file version {version} not supported (max {kVersion}) !")
+    header = json.loads(handle.read(header_size).decode("utf-8"))
+
+    table = header[kBlocks]
+    size = 0
+    for info in table.values():
+        nbytes = int(np.prod(info[kShape])) * np.dtype(info[kDtype]).itemsize
+        size = max(size, info[kOffset] + nbytes + _padding(nbytes))
+
+    return header[kData], table, start + data_offset, start + data_offset + size
+
+
+def read_header(path: str | Path) -> tuple:
+    """!@Brief Read json header of binary file. Return (data, block table, data offset)."""
+    with open(path, "rb") as handle:
+        data, table, data_offset, _ = _read_record_header(handle, 0)
+
+    return data, table, data_offset
+
+
+def read_block(path: str | Path, table: dict, data_offset: int, name: str, mmap: bool = True) -> np.ndarray:
+    """!@Brief Read one block of binary file."""
+    if name not in table:
+        raise KeyError(f"Block {name} not found in {path} !")
+
+    info = table[name]
+    dtype = np.dtype(info[kDtype])
+    shape = tuple(info[kShape])
+    offset = data_offset + info[kOffset]
+    count = int(np.prod(shape))
+    if count == 0:
+        return np.empty(shape, dtype=dtype)
+    if mmap:
+        return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape)
+
+    with open(path, "rb") as handle:
+        handle.seek(offset)
+        return np.fromfile(handle, dtype=dtype, count=count).reshape(shape)
+
+
+def read(path: str | Path, mmap: bool = True) -> tuple:
+    """!@Brief Read binary file. Return (data, blocks).
+               With mmap blocks are numpy.memmap and are only loaded on access.
+    """
+    if not Path(path).is_file():
+        raise RuntimeError(f"Path {path} is not a file !")
+
+    try:
+        data, table, data_offset = read_header(path)
+        blocks = {name: read_block(path, table, data_offset, name, mmap=mmap) for name in table}
+    except Exception:
+        log.debug(traceback.format_exc())
+        raise RuntimeError(f"Error on read binary file {path}")
+
+    return data, blocks
+
+
+def records(path: str | Path, mmap: bool = True, load_blocks: bool = True):
+    """!@Brief Iterate over all records of an appended file. Yield (data, blocks).
+               Without load_blocks only json headers are read.
+    """
+    if not Path(path).is_file():
+        raise RuntimeError(f"Path {path} is not a file !")
+
+    file_size = Path(path).stat().st_size
+    start = 0
+    while start < file_size:
+        with open(path, "rb") as handle:
+            data, table, data_offset, start = _read_record_header(handle, start)
+        blocks = {}
+        if load_blocks:
+            blocks = {name: read_block(path, table, data_offset, name, mmap=mmap) for name in table}
+        yield data, blocks
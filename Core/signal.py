@@ -45,5 +45,6 @@ class Signal:
 
     def emit(self, *args: T) -> None:
         if not self.lock:
-            for slot in self._callbacks:
+            self._callbacks = [x for x in self._callbacks if x() is not None]
+            for slot in list(self._callbacks):
                 slot()(*args)
\ No newline at end of file
@@ -0,0 +1,293 @@
+"""
+BlendShape target archive.
+
+One binary block file (see Core.binaryFile) for many blendShapes.
+The json header is the index: blendShape name, shape and for each target its name, index, item and block names.
+item is the inputTargetItem index (5000 + weight * 1000, 6000 for the target at 1.0), in-betweens are stored
+as entries with the same index and another item. Base points of the deformed shape can be stored too.
+Each target store its component indices (int32), offsets (float32, (N, 3)) and target weights (float32)
+as contiguous blocks, so targets can be loaded one by one with numpy.memmap.
+Target weights are the painted weights at the entry vertices, parallel to vertices (N,), or empty when the
+target is not painted (all 1.0). In-betweens store the weights of their own vertices.
+
+Each target store a content hash of its stored blocks. On incremental write, targets given without arrays
+keep their blocks from the previous archive.
+
+Offsets smaller than epsilon can be pruned and offsets can be quantized to int16 with a per target scale
+(offset = value * scale). The max reconstruction error is stored per target and in the header.
+"""
+
+from __future__ import annotations
+import hashlib
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from ..Core import binaryFile
+from ..Core.logger import log
+
+
+kFormat = "format"
+kFormatVersion = 2
+kDeformers = "deformers"
+kEpsilon = "epsilon"
+kQuantize = "quantize"
+kError = "error"
+kScale = "scale"
+kHash = "hash"
+kQuantizeMax = np.iinfo(np.int16).max
+
+kShape = "shape"
+kName = "name"
+kTarget = "target"
+kIndex = "index"
+kVertices = "vertices"
+kWeights = "weights"
+kOffsets = "offsets"
+kCount = "count"
+kItem = "item"
+kBase = "base"
+kDefaultItem = 6000
+kArrays = (kVertices, kOffsets, kWeights)
+kArrayTypes = {kVertices: np.int32, kOffsets: np.float32, kWeights: np.float32}
+
+
+def _block_name(deformer_id: int, target_id: int, key: str) -> str:
+    return f"{deformer_id}.{target_id}.{key}"
+
+
+def is_archive(path: str | Path) -> bool:
+    return binaryFile.is_binary(path)
+
+
+def _to_array(values, key: str) -> np.ndarray:
+    array = np.asarray(values, dtype=kArrayTypes[key])
+    return array.reshape(-1, 3) if key == kOffsets else array.reshape(-1)
+
+
+def prune(vertices: np.ndarray, offsets: np.ndarray, weights: np.ndarray, epsilon: float) -> tuple:
+    """!@Brief Remove offsets with length lower than epsilon, weights parallel to vertices are removed too.
+               Return (vertices, offsets, weights, max pruned length).
+    """
+    lengths = np.linalg.norm(offsets, axis=1)
+    mask = lengths >= epsilon
+    error = float(lengths[~mask].max()) if not mask.all() else 0.0
+    if len(weights):
+        weights = weights[mask]
+
+    return vertices[mask], offsets[mask], weights, error
+
+
+def quantize(offsets: np.ndarray) -> tuple:
+    """!@Brief Quantize offsets to int16. Return (values, scale, max error)."""
+    scale = float(np.abs(offsets).max()) / kQuantizeMax if offsets.size else 0.0
+    if scale == 0.0:
+        return np.zeros(offsets.shape, dtype=np.int16), 1.0, 0.0
+
+    values = np.round(offsets / scale).astype(np.int16)
+    error = float(np.linalg.norm(values * scale - offsets, axis=1).max())
+
+    return values, scale, error
+
+
+def dequantize(values: np.ndarray, scale: float) -> np.ndarray:
+    return (values * np.float32(scale)).astype(np.float32)
+
+
+def content_hash(arrays: dict) -> str:
+    """!@Brief Hash of stored target blocks."""
+    content = hashlib.blake2b(digest_size=16)
+    for key in kArrays:
+        content.update(np.ascontiguousarray(arrays[key]).tobytes())
+
+    return content.hexdigest()
+
+
+def item_weight(item: int) -> float:
+    """!@Brief Get target weight of inputTargetItem index."""
+    return (item - 5000) / 1000.0
+
+
+def write(path: str | Path, deformers: list, epsilon: float = 0.0, quantized: bool = False,
+          previous: Optional[Archive] = None) -> int:
+    """!@Brief Write blendShapes data (list of blendShapeData.to_dict) to archive. Return file size.
+               Offsets lower than epsilon are pruned, with quantized offsets are stored as int16.
+               With previous archive, targets without offsets reuse their previous blocks.
+    """
+    if previous is not None and (previous.epsilon != epsilon or previous.quantized != quantized):
+        raise RuntimeError("Previous archive was written with other epsilon / quantize settings !")
+
+    index = []
+    blocks = {}
+    max_error = 0.0
+    for i, deformer in enumerate(deformers):
+        targets = []
+        for j, target in enumerate(deformer.get(kTarget, [])):
+            if kOffsets not in target:
+                if previous is None:
+                    raise RuntimeError(f"No data for target {target[kName]} and no previous archive !")
+                target_index, arrays = previous.stored_target(deformer.get(kName), target[kIndex],
+                                                              target.get(kItem, kDefaultItem))
+                target_index[kName] = target[kName]
+                for key in kArrays:
+                    blocks[_block_name(i, j, key)] = arrays[key]
+                    target_index[key] = _block_name(i, j, key)
+                max_error = max(max_error, target_index.get(kError, 0.0))
+                targets.append(target_index)
+                continue
+
+            target_index = {kName: target[kName], kIndex: target[kIndex], kItem: target.get(kItem, kDefaultItem)}
+            arrays = {key: _to_array(target.get(key, []), key) for key in kArrays}
+            if len(arrays[kWeights]) and len(arrays[kWeights]) != len(arrays[kVertices]):
+                raise ValueError(f"Target {target[kName]}: weights must be parallel to vertices !")
+
+            error = 0.0
+            if epsilon > 0.0:
+                pruned = prune(arrays[kVertices], arrays[kOffsets], arrays[kWeights], epsilon)
+                arrays[kVertices], arrays[kOffsets], arrays[kWeights], error = pruned
+            if quantized:
+                arrays[kOffsets], target_index[kScale], quantize_error = quantize(arrays[kOffsets])
+                error = max(error, quantize_error)
+            target_index[kError] = error
+            max_error = max(max_error, error)
+
+            for key in kArrays:
+                blocks[_block_name(i, j, key)] = arrays[key]
+                target_index[key] = _block_name(i, j, key)
+            target_index[kCount] = len(arrays[kVertices])
+            target_index[kHash] = content_hash(arrays)
+            targets.append(target_index)
+        deformer_index = {kShape: deformer.get(kShape), kName: deformer.get(kName), kTarget: targets}
+        if deformer.get(kBase) is not None:
+            blocks[f"{i}.{kBase}"] = np.asarray(deformer[kBase], dtype=np.float64).reshape(-1, 3)
+            deformer_index[kBase] = f"{i}.{kBase}"
+        index.append(deformer_index)
+
+    data = {kFormat: kFormatVersion, kDeformers: index, kEpsilon: epsilon, kQuantize: quantized, kError: max_error}
+    size = binaryFile.write(path, data, blocks)
+    log.debug(f"BlendShape archive write -> {path}")
+
+    return size
+
+
+class Archive(object):
+
+    """!@Brief Lazy reader of blendShape archive. Target arrays are only read on access."""
+
+    def __init__(self, path: str | Path, mmap: bool = True):
+        self._path = str(path)
+        self._mmap = mmap
+        data, self._table, self._data_offset = binaryFile.read_header(self._path)
+        if data.get(kFormat, 0) > kFormatVersion:
+            raise RuntimeError(f"BlendShape archive format {data[kFormat]} not supported !")
+        self._deformers = data.get(kDeformers, [])
+        self._error = data.get(kError, 0.0)
+        self._epsilon = data.get(kEpsilon, 0.0)
+        self._quantized = data.get(kQuantize, False)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(path: {self._path}, deformers: {len(self._deformers)})"
+
+    def __len__(self) -> int:
+        return len(self._deformers)
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def error(self) -> float:
+        """!@Brief Max offset reconstruction error of pruning and quantization."""
+        return self._error
+
+    @property
+    def epsilon(self) -> float:
+        return self._epsilon
+
+    @property
+    def quantized(self) -> bool:
+        return self._quantized
+
+    @property
+    def deformers(self) -> list:
+        """!@Brief Archive index, without arrays."""
+        return self._deformers
+
+    def read_block(self, name: str) -> np.ndarray:
+        return binaryFile.read_block(self._path, self._table, self._data_offset, name, mmap=self._mmap)
+
+    def target(self, deformer_id: int, target_id: int) -> dict:
+        """!@Brief Get target entry like blendShapeData.to_dict with numpy arrays."""
+        target_index = self._deformers[deformer_id][kTarget][target_id]
+        target = {kName: target_index[kName], kIndex: target_index[kIndex],
+                  kItem: target_index.get(kItem, kDefaultItem)}
+        for key in kArrays:
+            target[key] = self.read_block(target_index[key])
+        if kScale in target_index:
+            target[kOffsets] = dequantize(target[kOffsets], target_index[kScale])
+
+        return target
+
+    def base(self, deformer_id: int) -> Optional[np.ndarray]:
+        """!@Brief Get base points (V, 3) of blendShape. None if not stored."""
+        name = self._deformers[deformer_id].get(kBase)
+        return None if name is None else self.read_block(name)
+
+    def deformer_id(self, deformer_name: str) -> int:
+        for i, deformer in enumerate(self._deformers):
+            if deformer[kName] == deformer_name:
+                return i
+
+        raise RuntimeError(f"BlendShape {deformer_name} not found in {self._path} !")
+
+    def find(self, deformer_name: str, target_index: int, item: int = kDefaultItem) -> Optional[tuple]:
+        """!@Brief Get (deformer id, target id) of blendShape target. None if not found."""
+        for i, deformer in enumerate(self._deformers):
+            if deformer[kName] != deformer_name:
+                continue
+            for j, target in enumerate(deformer[kTarget]):
+                if target[kIndex] == target_index and target.get(kItem, kDefaultItem) == item:
+                    return i, j
+
+        return None
+
+    def hashes(self, deformer_name: str) -> dict:
+        """!@Brief Get {(target index, item): content hash} of blendShape."""
+        for deformer in self._deformers:
+            if deformer[kName] == deformer_name:
+                return {(x[kIndex], x.get(kItem, kDefaultItem)): x.get(kHash) for x in deformer[kTarget]}
+
+        return {}
+
+    def stored_target(self, deformer_name: str, target_index: int, item: int = kDefaultItem) -> tuple:
+        """!@Brief Get (target index data, blocks) as stored, without dequantization. Blocks are read in memory."""
+        ids = self.find(deformer_name, target_index, item)
+        if ids is None:
+            raise RuntimeError(f"Target {target_index} of {deformer_name} not found in {self._path} !")
+
+        target_index = dict(self._deformers[ids[0]][kTarget][ids[1]])
+        arrays = {key: binaryFile.read_block(self._path, self._table, self._data_offset, target_index[key], mmap=False)
+                  for key in kArrays}
+        if kHash not in target_index:
+            target_index[kHash] = content_hash(arrays)
+
+        return target_index, arrays
+
+    def iter_targets(self, deformer_id: int):
+        for i in range(len(self._deformers[deformer_id][kTarget])):
+            yield self.target(deformer_id, i)
+
+    def deformer(self, deformer_id: int) -> dict:
+        """!@Brief Get blendShape data like blendShapeData.to_dict, target arrays are lazy loaded when mmap is used."""
+        data = {kShape: self._deformers[deformer_id][kShape], kName: self._deformers[deformer_id][kName]}
+        data[kBase] = self.base(deformer_id)
+        data[kTarget] = list(self.iter_targets(deformer_id))
+
+        return data
+
+
+def read(path: str | Path, mmap: bool = True) -> list:
+    """!@Brief Read all blendShapes data of archive."""
+    archive = Archive(path, mmap=mmap)
+    return [archive.deformer(i) for i in range(len(archive))]
@@ -0,0 +1,381 @@
+"""
+BlendShape data extraction and application with API 2.0, saved as binary archive or json.
+
+Data has the layout of blendShapeArchive:
+    {shape, name, base, target: [{name, index, item, vertices, weights, offsets}, ...]}
+One target entry per inputTargetItem, in-betweens are entries with the same index and another item.
+
+Live API of the quoted Helpers.blendShape.BlendShape class:
+    - save, save_all, apply_all, read, dump: binary archive (blendShapeArchive), incremental save with DirtyTargets.
+    - apply: numpy target injection, optionally in one MDGModifier.
+    - to_dict, extract_meshes: batched, connection-safe target reads.
+    - add_corrective: pre skin corrective from a skinned sculpt.
+    - refresh_targets, refresh_target_weights, restore_weights: batched target and paint weights updates.
+"""
+
+from __future__ import annotations
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from maya import cmds
+from maya.api import OpenMaya, OpenMayaAnim
+
+from ..Core.logger import log
+from ..Helpers import blendShapeArchive, blendShapeTargets, utils
+from ..Helpers.deformer import Deformer
+from ..Helpers.skin import Skin
+
+
+kApiType = OpenMaya.MFn.kBlendShape
+kDefaultName = "blendShape1"
+
+
+def find(node: str | OpenMaya.MObject) -> Optional[OpenMaya.MObject]:
+    """!@Brief Find blendShape from given shape or transform."""
+    return Deformer._find(node, kApiType)
+
+
+def _check_blend_shape(node: str | OpenMaya.MObject) -> OpenMaya.MObject:
+    node = utils.check_object(node)
+    if not node.hasFn(kApiType):
+        raise RuntimeError(f"Node must be a BlendShape not {node.apiTypeStr} !")
+
+    return node
+
+
+def target_index(node: str | OpenMaya.MObject, name: str) -> int:
+    """!@Brief Get target index from weight alias, cached until targets or aliases change."""
+    return blendShapeTargets.plug_cache(_check_blend_shape(node)).index(name)
+
+
+def target_name(node: str | OpenMaya.MObject, index: int) -> str:
+    return blendShapeTargets.plug_cache(_check_blend_shape(node)).name(index)
+
+
+def target_names(node: str | OpenMaya.MObject) -> list:
+    """!@Brief Get weight alias of all targets, target indices order."""
+    return blendShapeTargets.plug_cache(_check_blend_shape(node)).names()
+
+
+def target_indices(node: str | OpenMaya.MObject) -> list:
+    return blendShapeTargets.plug_cache(_check_blend_shape(node)).indices()
+
+
+def to_dict(node: str | OpenMaya.MObject, input_index: int = 0, reuse: Optional[set] = None) -> dict:
+    """!@Brief Get blendShape data of one input shape. Targets are read in one pass per inputTargetItem.
+               Targets in reuse only get name, index and item (see blendShapeArchive.write previous).
+    """
+    node = _check_blend_shape(node)
+    mfn = OpenMayaAnim.MFnGeometryFilter(node)
+    outputs = mfn.getOutputGeometry()
+    if len(outputs) == 0:
+        raise RuntimeError(f'No output geometry found for "{utils.name(node)}" !')
+
+    base = blendShapeTargets.mesh_points(mfn.getInputGeometry()[input_index])
+    cache = blendShapeTargets.plug_cache(node)
+    reuse = reuse or set()
+    indices = cache.indices()
+    extracted = [x for x in indices if x not in reuse]
+    paint_weights = blendShapeTargets.read_target_weights(node, extracted, len(base), input_index=input_index)
+
+    items = {}
+    for target_index in indices:
+        for item in blendShapeTargets.item_indices(node, target_index, input_index):
+            items.setdefault(item, []).append(target_index)
+
+    targets = []
+    for item in sorted(items, key=lambda x: x != blendShapeTargets.kDefaultWeightId):
+        data = blendShapeTargets.read_targets(node, [x for x in items[item] if x not in reuse],
+                                              input_index=input_index, weight_index=item)
+        for target_index in items[item]:
+            target = {blendShapeArchive.kName: cache.name(target_index),
+                      blendShapeArchive.kIndex: target_index,
+                      blendShapeArchive.kItem: item}
+            targets.append(target)
+            if target_index in reuse:
+                continue
+            vertex_ids, offsets = data[target_index]
+            weights = paint_weights[target_index][vertex_ids]
+            target[blendShapeArchive.kVertices] = vertex_ids
+            target[blendShapeArchive.kOffsets] = offsets
+            target[blendShapeArchive.kWeights] = np.zeros(0) if np.all(weights == 1.0) else weights
+
+    return {blendShapeArchive.kShape: utils.name(outputs[input_index]),
+            blendShapeArchive.kName: utils.name(node),
+            blendShapeArchive.kBase: base,
+            blendShapeArchive.kTarget: targets}
+
+
+def _shape_from_data(data: dict, mesh_namespace: Optional[str] = None) -> str:
+    shape = data.get(blendShapeArchive.kShape)
+    if shape is None:
+        raise RuntimeError("No shape found on data !")
+
+    if mesh_namespace:
+        shape = f"{mesh_namespace}:{utils.short_name(shape)}"
+    else:
+        shape = OpenMaya.MNamespace.stripNamespaceFromName(shape)
+    shapes = cmds.ls(shape, long=True)
+    if len(shapes) > 1:
+        raise RuntimeError("Multi shape found {0}".format("\n\t".join(shapes)))
+    elif len(shapes) == 0:
+        raise RuntimeError(f"Shape {shape} not found !")
+
+    return shapes[0]
+
+
+def _add_weight(node: OpenMaya.MObject, target_index: int, alias: str):
+    """!@Brief Create visible weight element of target, set to 0.0, with its alias."""
+    weight = blendShapeTargets.plug_cache(node).weight_element(target_index)
+    weight.setFloat(0.0)
+    OpenMaya.MFnAttribute(weight.attribute()).hidden = False
+    cmds.aliasAttr(alias, f"{utils.name(node)}.weight[{target_index}]")
+
+
+def apply(data: dict, mesh_namespace: Optional[str] = None, single_modifier: bool = True) -> OpenMaya.MObject:
+    """!@Brief Create blendShape from data, offsets and components are built from numpy buffers.
+               With single_modifier all targets are written in one MDGModifier, else each target is set directly.
+               Targets can be a lazy iterator (see blendShapeArchive.Archive.iter_targets).
+    """
+    shape = _shape_from_data(data, mesh_namespace)
+    name = utils.short_name(data.get(blendShapeArchive.kName) or kDefaultName)
+    node = utils.get_object(cmds.blendShape(shape, name=name)[0])
+
+    modifier = OpenMaya.MDGModifier() if single_modifier else None
+    names = {}
+    paint_weights = {}
+    for target in data[blendShapeArchive.kTarget]:
+        target_index = target[blendShapeArchive.kIndex]
+        vertex_ids = np.asarray(target[blendShapeArchive.kVertices], dtype=np.int64)
+        item = target.get(blendShapeArchive.kItem, blendShapeArchive.kDefaultItem)
+        blendShapeTargets.write_target(node, target_index, vertex_ids, target[blendShapeArchive.kOffsets],
+                                       weight_index=item, modifier=modifier)
+        names.setdefault(target_index, target[blendShapeArchive.kName])
+        weights = np.asarray(target.get(blendShapeArchive.kWeights, []), dtype=np.float64)
+        if len(weights):
+            paint_weights.setdefault(target_index, []).append((vertex_ids, weights))
+    if modifier is not None:
+        modifier.doIt()
+
+    for target_index, alias in names.items():
+        _add_weight(node, target_index, alias)
+
+    blendShapeTargets.restore_target_weights(node, {k: tuple(np.concatenate(x) for x in zip(*v))
+                                                    for k, v in paint_weights.items()})
+
+    return node
+
+
+def _target_ids(node: OpenMaya.MObject, targets: Optional[list] = None) -> list:
+    """!@Brief Get target indices from indices or weight aliases, all targets if None."""
+    cache = blendShapeTargets.plug_cache(node)
+    if targets is None:
+        return cache.indices()
+
+    return [cache.index(x) if isinstance(x, str) else int(x) for x in targets]
+
+
+def _vertex_count(node: OpenMaya.MObject, input_index: int = 0) -> int:
+    return OpenMaya.MFnMesh(OpenMayaAnim.MFnGeometryFilter(node).getInputGeometry()[input_index]).numVertices
+
+
+def refresh_targets(node: str | OpenMaya.MObject, targets: Optional[list] = None,
+                    input_index: int = 0) -> Optional[OpenMaya.MDGModifier]:
+    """!@Brief Reconnect connected target geometries of given targets (indices or aliases) in one modifier."""
+    node = _check_blend_shape(node)
+    return blendShapeTargets.refresh_targets(node, _target_ids(node, targets), input_index=input_index)
+
+
+def refresh_target_weights(node: str | OpenMaya.MObject, targets: Optional[list] = None, input_index: int = 0):
+    """!@Brief Set target weights of given targets (indices or aliases) from their offset lengths."""
+    node = _check_blend_shape(node)
+    blendShapeTargets.refresh_target_weights(node, _target_ids(node, targets), _vertex_count(node, input_index),
+                                             input_index=input_index)
+
+
+def restore_weights(node: str | OpenMaya.MObject, data: dict, input_index: int = 0):
+    """!@Brief Restore target weights of to_dict data on node, entries are matched by target name."""
+    node = _check_blend_shape(node)
+    cache = blendShapeTargets.plug_cache(node)
+    paint_weights = {}
+    for target in data[blendShapeArchive.kTarget]:
+        weights = np.asarray(target.get(blendShapeArchive.kWeights, []), dtype=np.float64)
+        if len(weights):
+            vertex_ids = np.asarray(target[blendShapeArchive.kVertices], dtype=np.int64)
+            paint_weights.setdefault(cache.index(target[blendShapeArchive.kName]), []).append((vertex_ids, weights))
+
+    blendShapeTargets.restore_target_weights(node, {k: tuple(np.concatenate(x) for x in zip(*v))
+                                                    for k, v in paint_weights.items()}, input_index=input_index)
+
+
+def extract_meshes(node: str | OpenMaya.MObject, targets: Optional[list] = None,
+                   point_cache: Optional[str | Path] = None, epsilon: float = 0.0, input_index: int = 0,
+                   connect: bool = True) -> list | int:
+    """!@Brief Extract targets (indices or aliases, all if None) with one read of targets and base points.
+               Create one mesh per target, connected to its target geometry if connect and not already connected,
+               or write all target points in point_cache (see blendShapeTargets.write_point_cache).
+               Return created transforms or point cache file size.
+    """
+    node = _check_blend_shape(node)
+    cache = blendShapeTargets.plug_cache(node)
+    targets = _target_ids(node, targets)
+    names = [cache.name(x) for x in targets]
+    base = OpenMayaAnim.MFnGeometryFilter(node).getInputGeometry()[input_index]
+    base_points = blendShapeTargets.mesh_points(base)
+    data = blendShapeTargets.read_targets(node, targets, input_index=input_index)
+    if point_cache is not None:
+        return blendShapeTargets.write_point_cache(point_cache, base_points, names, targets, data, epsilon=epsilon)
+
+    meshes = blendShapeTargets.create_meshes(
+        base, names, (blendShapeTargets.target_points(base_points, *data[x], epsilon=epsilon) for x in targets))
+    if connect:
+        free = [(mesh, target) for mesh, target in zip(meshes, targets)
+                if cache.item_child(target, blendShapeTargets.kInputGeomTarget, input_index).source().isNull]
+        if free:
+            blendShapeTargets.connect_meshes(node, *zip(*free), input_index=input_index)
+
+    return meshes
+
+
+def add_corrective(node: str | OpenMaya.MObject, sculpt: str | OpenMaya.MObject, skin: str | Skin,
+                   target: Optional[int | str] = None, input_index: int = 0,
+                   epsilon: float = 1e-6) -> OpenMaya.MDGModifier:
+    """!@Brief Add sculpt of skinned shape as pre skin corrective target. Sculpt points are un-skinned with
+               skin weights and skinning matrices (see blendShapeTargets.invert_skinning), offsets from blendShape
+               input points below epsilon are pruned. target is an index or alias, a new target is created
+               if None or alias not found (named after sculpt). Return modifier for undo.
+    """
+    node = _check_blend_shape(node)
+    skin = skin if isinstance(skin, Skin) else Skin.get(skin)
+    sculpt_path = utils.get_path(sculpt)
+    sculpt_path.extendToShape()
+
+    cache = blendShapeTargets.plug_cache(node)
+    indices = cache.indices()
+    alias = None
+    if isinstance(target, str) and target in cache.names():
+        target = cache.index(target)
+    elif target is None or isinstance(target, str):
+        alias = target or utils.short_name(utils.name(sculpt_path.transform()))
+        target = max(indices, default=-1) + 1
+
+    points = blendShapeTargets.invert_skinning(blendShapeTargets.mesh_points(sculpt_path), skin.weights,
+                                               skin.skinning_matrices())
+    base = OpenMayaAnim.MFnGeometryFilter(node).getInputGeometry()[input_index]
+    offsets = points - blendShapeTargets.mesh_points(base)
+    vertex_ids = np.flatnonzero(np.linalg.norm(offsets, axis=1) >= epsilon)
+
+    modifier = OpenMaya.MDGModifier()
+    blendShapeTargets.write_target(node, target, vertex_ids, offsets[vertex_ids], input_index=input_index,
+                                   modifier=modifier)
+    modifier.doIt()
+    if alias is not None:
+        _add_weight(node, target, alias)
+    log.debug(f"Corrective target {target} on {utils.name(node)}, {len(vertex_ids)} vertices.")
+
+    return modifier
+
+
+def _to_json(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, dict):
+        return {k: _to_json(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(x) for x in value]
+    return value
+
+
+def dump(data: dict | list, file_path: str | Path, binary: bool = True, epsilon: float = 0.0,
+         quantized: bool = False, previous: Optional[blendShapeArchive.Archive] = None):
+    """!@Brief Write blendShapes data. Binary archive by default (see blendShapeArchive.write), json for legacy."""
+    data = [data] if isinstance(data, dict) else data
+    if binary:
+        blendShapeArchive.write(file_path, data, epsilon=epsilon, quantized=quantized, previous=previous)
+        return
+
+    Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(file_path, "w") as stream:
+        json.dump(_to_json(data), stream)
+    log.debug(f"BlendShape file write -> {file_path}")
+
+
+def read(file_path: str | Path) -> list:
+    """!@Brief Read blendShapes data of binary archive or json file."""
+    if not os.path.exists(file_path):
+        raise RuntimeError(f'Path "{file_path}" does not exists !')
+
+    if blendShapeArchive.is_archive(file_path):
+        return blendShapeArchive.read(file_path)
+
+    with open(file_path, "r") as stream:
+        data = json.load(stream)
+    if not isinstance(data, (dict, list)):
+        raise RuntimeError(f'Data read is not a valid BlendShape data "{file_path}" !')
+
+    return [data] if isinstance(data, dict) else data
+
+
+def save(node: str | OpenMaya.MObject, file_path: str | Path, binary: bool = True, epsilon: float = 0.0,
+         quantized: bool = False, tracker: Optional[blendShapeTargets.DirtyTargets] = None):
+    """!@Brief Save one blendShape. With tracker, if file_path is the archive written at its last save,
+               only dirty targets are extracted, clean targets whose items are all stored keep their blocks.
+    """
+    node = _check_blend_shape(node)
+    previous = None
+    reuse = set()
+    if binary and tracker is not None and tracker.saved_path == str(file_path) and \
+            blendShapeArchive.is_archive(file_path):
+        previous = blendShapeArchive.Archive(file_path)
+        if previous.epsilon == epsilon and previous.quantized == quantized:
+            stored = set(previous.hashes(utils.name(node)))
+            clean = {x for x, _ in stored} - tracker.targets()
+            reuse = {x for x in clean if all((x, item) in stored for item in blendShapeTargets.item_indices(node, x))}
+        else:
+            previous = None
+
+    data = to_dict(node, reuse=reuse)
+    dump(data, file_path, binary=binary, epsilon=epsilon, quantized=quantized, previous=previous)
+    if tracker is not None:
+        # Extraction disconnect / reconnect targets and dirty them, data is up to date here.
+        tracker.clear(file_path if binary else None)
+    log.debug(f"BlendShape {utils.name(node)} save, {len(reuse)} target(s) reused.")
+
+
+def save_all(nodes: list, file_path: str | Path, binary: bool = True, epsilon: float = 0.0, quantized: bool = False):
+    """!@Brief Save blendShapes found on given shapes or transforms in one file."""
+    data = []
+    for node in nodes:
+        blend_shape = find(node)
+        if blend_shape is None:
+            continue
+        data.append(to_dict(blend_shape))
+
+    dump(data, file_path, binary=binary, epsilon=epsilon, quantized=quantized)
+
+
+def apply_all(file_path: str | Path, mesh_namespace: Optional[str] = None, single_modifier: bool = True) -> list:
+    """!@Brief Apply all blendShapes of file. Binary archive targets are loaded one by one."""
+    if not os.path.isfile(file_path):
+        raise RuntimeError(f"Invalid path given -- {file_path}")
+
+    if blendShapeArchive.is_archive(file_path):
+        archive = blendShapeArchive.Archive(file_path)
+        data = [{blendShapeArchive.kShape: x[blendShapeArchive.kShape],
+                 blendShapeArchive.kName: x[blendShapeArchive.kName],
+                 blendShapeArchive.kTarget: archive.iter_targets(i)} for i, x in enumerate(archive.deformers)]
+    else:
+        data = read(file_path)
+
+    output = []
+    for blend_shape_data in data:
+        try:
+            output.append(apply(blend_shape_data, mesh_namespace=mesh_namespace, single_modifier=single_modifier))
+        except Exception as e:
+            log.error(f'{e}\nImpossible to apply BlendShape on "{blend_shape_data.get(blendShapeArchive.kShape)}"')
+
+    return output
@@ -0,0 +1,151 @@
+"""
+Offline blendShape evaluation from archive (see blendShapeArchive), without Maya.
+
+Offsets of all archive entries (targets and in-betweens) are stored as one sparse matrix sorted by vertex.
+Each target weight is converted to entry coefficients with the piecewise linear in-between interpolation
+(implicit zero offset at weight 0, linear extrapolation out of the item range).
+Frames are evaluated at once: points = base + offsets (V, E) . coefficients (E, F).
+"""
+
+from __future__ import annotations
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from ..Helpers import blendShapeArchive
+from ..Helpers.blendShapeArchive import Archive
+
+
+class BlendShapeEvaluator(object):
+
+    kMaxElements = 1 << 24
+
+    def __init__(self, archive: str | Path | Archive, deformer: int | str = 0,
+                 base_points: Optional[np.ndarray] = None):
+        if not isinstance(archive, Archive):
+            archive = Archive(archive)
+        deformer_id = archive.deformer_id(deformer) if isinstance(deformer, str) else deformer
+
+        self._name = archive.deformers[deformer_id][blendShapeArchive.kName]
+        self._base = base_points if base_points is not None else archive.base(deformer_id)
+
+        entries = list(archive.iter_targets(deformer_id))
+        self._targets = sorted({x[blendShapeArchive.kIndex] for x in entries})
+        self._names = []
+        for target_index in self._targets:
+            main = [x for x in entries if x[blendShapeArchive.kIndex] == target_index and
+                    x[blendShapeArchive.kItem] == blendShapeArchive.kDefaultItem]
+            self._names.append((main or [x for x in entries if x[blendShapeArchive.kIndex] == target_index])[0]
+                               [blendShapeArchive.kName])
+        self._entry_targets = np.array([self._targets.index(x[blendShapeArchive.kIndex]) for x in entries],
+                                       dtype=np.int64)
+        self._entry_weights = np.array([blendShapeArchive.item_weight(x[blendShapeArchive.kItem]) for x in entries])
+
+        self._build_matrix(entries)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(name: {self._name}, targets: {len(self._targets)}, nnz: {len(self._rows)})"
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def targets(self) -> list:
+        """!@Brief Target indices, order of weight columns."""
+        return self._targets
+
+    @property
+    def target_names(self) -> list:
+        return self._names
+
+    @property
+    def vertex_count(self) -> int:
+        return self._vertex_count
+
+    def _build_matrix(self, entries: list):
+        """!@Brief Build sparse (vertex, entry) offsets sorted by vertex.
+                   Entry paint weights (parallel to vertices, see blendShapeArchive) are applied here.
+        """
+        rows, columns, values = [], [], []
+        for i, entry in enumerate(entries):
+            vertices = np.asarray(entry[blendShapeArchive.kVertices], dtype=np.int64)
+            offsets = np.asarray(entry[blendShapeArchive.kOffsets], dtype=np.float64).reshape(-1, 3)
+            weights = np.asarray(entry[blendShapeArchive.kWeights], dtype=np.float64).reshape(-1)
+            if len(weights):
+                if len(weights) != len(vertices):
+                    name = entry[blendShapeArchive.kName]
+                    raise RuntimeError(f"Target {name}: weights are not parallel to vertices !")
+                offsets = offsets * weights[:, None]
+            rows.append(vertices)
+            columns.append(np.full(len(vertices), i, dtype=np.int64))
+            values.append(offsets)
+
+        rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+        order = np.argsort(rows, kind="stable")
+        self._rows = rows[order]
+        self._columns = np.concatenate(columns)[order] if columns else np.zeros(0, dtype=np.int64)
+        self._values = np.concatenate(values)[order] if values else np.zeros((0, 3))
+
+        self._vertex_count = len(self._base) if self._base is not None else int(self._rows.max(initial=-1)) + 1
+        if len(self._rows) and self._rows[-1] >= self._vertex_count:
+            raise RuntimeError(f"Target vertex {self._rows[-1]} out of base points ({self._vertex_count}) !")
+        self._starts = np.flatnonzero(np.r_[True, self._rows[1:] != self._rows[:-1]]) if len(self._rows) else \
+            np.zeros(0, dtype=np.int64)
+
+    def weight_matrix(self, weights: np.ndarray | dict, frame_count: Optional[int] = None) -> np.ndarray:
+        """!@Brief Get (frame, target) weights from array (target,) / (frame, target) or {name or index: value(s)}."""
+        if isinstance(weights, dict):
+            frame_count = frame_count or max([np.size(x) for x in weights.values()] + [1])
+            output = np.zeros((frame_count, len(self._targets)))
+            for key, value in weights.items():
+                column = self._names.index(key) if isinstance(key, str) else self._targets.index(key)
+                output[:, column] = value
+            return output
+
+        weights = np.asarray(weights, dtype=np.float64)
+        return weights.reshape(1, -1) if weights.ndim == 1 else weights
+
+    def coefficients(self, weights: np.ndarray) -> np.ndarray:
+        """!@Brief Get (frame, entry) coefficients of (frame, target) weights with in-between interpolation."""
+        output = np.zeros((len(weights), len(self._entry_targets)))
+        for target_id in range(len(self._targets)):
+            entry_ids = np.flatnonzero(self._entry_targets == target_id)
+            knots = np.concatenate([[0.0], self._entry_weights[entry_ids]])
+            knot_entries = np.concatenate([[-1], entry_ids])
+            order = np.argsort(knots)
+            knots, knot_entries = knots[order], knot_entries[order]
+
+            value = weights[:, target_id]
+            segment = np.clip(np.searchsorted(knots, value, side="right") - 1, 0, len(knots) - 2)
+            t = (value - knots[segment]) / (knots[segment + 1] - knots[segment])
+            frames = np.arange(len(weights))
+            for entries, factor in ((knot_entries[segment], 1.0 - t), (knot_entries[segment + 1], t)):
+                valid = entries >= 0
+                output[frames[valid], entries[valid]] += factor[valid]
+
+        return output
+
+    def evaluate(self, weights: np.ndarray | dict, deltas: bool = False) -> np.ndarray:
+        """!@Brief Evaluate frames. Return (frame, vertex, 3) points, or offsets with deltas or without base."""
+        coefficients = self.coefficients(self.weight_matrix(weights))
+        frame_count = len(coefficients)
+        output = np.zeros((frame_count, self._vertex_count, 3))
+        if not deltas and self._base is not None:
+            output += np.asarray(self._base, dtype=np.float64)
+        if len(self._rows) == 0:
+            return output
+
+        unique_rows = self._rows[self._starts]
+        chunk = max(1, self.kMaxElements // (3 * len(self._rows)))
+        for start in range(0, frame_count, chunk):
+            block = coefficients[start:start + chunk]
+            contributions = block.T[self._columns][:, :, None] * self._values[:, None, :]
+            output[start:start + chunk, unique_rows] += np.add.reduceat(contributions, self._starts,
+                                                                        axis=0).transpose(1, 0, 2)
+
+        return output
+
+    def __call__(self, weights: np.ndarray | dict, deltas: bool = False) -> np.ndarray:
+        return self.evaluate(weights, deltas=deltas)
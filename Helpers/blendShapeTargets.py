@@ -0,0 +1,658 @@
+"""
+BlendShape target plugs, read and write with numpy buffers.
+
+    blendShape.inputTarget[input].inputTargetGroup[target].inputTargetItem[weight_id]
+        .inputGeomTarget (0) / .inputPointsTarget (3) / .inputComponentsTarget (4)
+
+weight_id is 5000 + weight * 1000, 6000 for the target at 1.0.
+"""
+
+from __future__ import annotations
+from pathlib import Path
+import re
+from typing import Optional
+import weakref
+
+import numpy as np
+
+from maya import cmds
+from maya.api import OpenMaya
+
+from ..Core import binaryFile
+from ..Core.decorator import ContextDecorator
+from ..Helpers.skinWeights import SparseWeights
+
+
+kInputTarget = "inputTarget"
+kWeight = "weight"
+kWeightAlias = re.compile(r"^weight\[(\d+)\]$")
+kDefaultWeightId = 6000
+
+kInputTargetGroup = 0
+kInputTargetItem = 0
+kTargetWeights = 1
+kInputGeomTarget = 0
+kInputPointsTarget = 3
+kInputComponentsTarget = 4
+
+kNames = "names"
+kTargets = "targets"
+kPoints = "points"
+kWorldMesh = "worldMesh"
+
+
+def input_target_plug(node: OpenMaya.MObject, input_index: int = 0) -> OpenMaya.MPlug:
+    plug = OpenMaya.MFnDependencyNode(node).findPlug(kInputTarget, False)
+    return plug.elementByLogicalIndex(input_index)
+
+
+def target_group_plug(node: OpenMaya.MObject, target_index: int, input_index: int = 0) -> OpenMaya.MPlug:
+    return plug_cache(node).group_plug(target_index, input_index)
+
+
+def target_item_plug(node: OpenMaya.MObject, target_index: int, input_index: int = 0,
+                     weight_index: int = kDefaultWeightId) -> OpenMaya.MPlug:
+    return plug_cache(node).item_plug(target_index, input_index, weight_index)
+
+
+def target_indices(node: OpenMaya.MObject, input_index: int = 0) -> list:
+    """!@Brief Get logical indices of existing targets."""
+    groups = plug_cache(node).input_plug(input_index).child(kInputTargetGroup)
+    return list(groups.getExistingArrayAttributeIndices())
+
+
+def item_indices(node: OpenMaya.MObject, target_index: int, input_index: int = 0) -> list:
+    """!@Brief Get existing inputTargetItem indices of target (6000 and in-betweens)."""
+    items = plug_cache(node).group_plug(target_index, input_index).child(kInputTargetItem)
+    return list(items.getExistingArrayAttributeIndices())
+
+
+def group_plugs(node: OpenMaya.MObject, targets: list, input_index: int = 0) -> dict:
+    """!@Brief Get {target index: inputTargetGroup plug} from the node plug cache."""
+    cache = plug_cache(node)
+    return {target_index: cache.group_plug(target_index, input_index) for target_index in targets}
+
+
+def item_plugs(node: OpenMaya.MObject, targets: list, input_index: int = 0,
+               weight_index: int = kDefaultWeightId) -> dict:
+    """!@Brief Get {target index: inputTargetItem plug} of many targets from the node plug cache."""
+    cache = plug_cache(node)
+    return {target_index: cache.item_plug(target_index, input_index, weight_index) for target_index in targets}
+
+
+def target_index_from_plug(plug: OpenMaya.MPlug) -> Optional[int]:
+    """!@Brief Get target index of plug under inputTarget.inputTargetGroup. None for other plugs."""
+    while True:
+        if plug.isElement:
+            if OpenMaya.MFnAttribute(plug.attribute()).name == "inputTargetGroup":
+                return plug.logicalIndex()
+            plug = plug.array()
+        elif plug.isChild:
+            plug = plug.parent()
+        else:
+            return None
+
+
+def _plug_cache_changed(*args):
+    cache = args[-1]()
+    if cache is None:
+        OpenMaya.MMessage.removeCallback(OpenMaya.MMessage.currentCallbackId())
+        return
+    cache.clear()
+
+
+def _plug_cache_attribute_changed(msg: int, plug: OpenMaya.MPlug, other_plug: OpenMaya.MPlug,
+                                  cache_ref: weakref.ref):
+    if msg & TargetPlugCache.kInvalidateMessages:
+        _plug_cache_changed(cache_ref)
+
+
+class TargetPlugCache(object):
+
+    """!@Brief Per node cache of target plugs and weight aliases.
+               Cleared when an attribute is added / removed, a weight element is added / removed,
+               an attribute is renamed or the node is renamed.
+    """
+
+    kInvalidateMessages = (OpenMaya.MNodeMessage.kAttributeArrayAdded |
+                           OpenMaya.MNodeMessage.kAttributeArrayRemoved |
+                           OpenMaya.MNodeMessage.kAttributeRenamed)
+
+    def __init__(self, node: OpenMaya.MObject):
+        self._handle = OpenMaya.MObjectHandle(node)
+        self._callback_ids = []
+        self._plugs = {}
+        self._indices = None
+        self._names = None
+        self._name_indices = None
+        self._install_callbacks()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(plugs: {len(self._plugs)})"
+
+    def __del__(self):
+        self._remove_callbacks()
+
+    @property
+    def node(self) -> OpenMaya.MObject:
+        return self._handle.object()
+
+    def is_valid(self) -> bool:
+        return self._handle.isValid() and self._handle.isAlive()
+
+    def _install_callbacks(self):
+        node = self.node
+        client_data = weakref.ref(self)
+        self._callback_ids = [
+            OpenMaya.MNodeMessage.addAttributeAddedOrRemovedCallback(node, _plug_cache_changed, client_data),
+            OpenMaya.MNodeMessage.addAttributeChangedCallback(node, _plug_cache_attribute_changed, client_data),
+            OpenMaya.MNodeMessage.addNameChangedCallback(node, _plug_cache_changed, client_data)]
+
+    def _remove_callbacks(self):
+        for callback_id in self._callback_ids:
+            try:
+                OpenMaya.MMessage.removeCallback(callback_id)
+            except RuntimeError:
+                pass
+        self._callback_ids = []
+
+    def clear(self):
+        self._plugs.clear()
+        self._indices = None
+        self._names = None
+        self._name_indices = None
+
+    def _plug(self, key: tuple, getter) -> OpenMaya.MPlug:
+        plug = self._plugs.get(key)
+        if plug is None:
+            plug = getter()
+            self._plugs[key] = plug
+
+        return plug
+
+    def weight_plug(self) -> OpenMaya.MPlug:
+        return self._plug((kWeight,), lambda: OpenMaya.MFnDependencyNode(self.node).findPlug(kWeight, False))
+
+    def weight_element(self, target_index: int) -> OpenMaya.MPlug:
+        return self._plug((kWeight, target_index), lambda: self.weight_plug().elementByLogicalIndex(target_index))
+
+    def input_plug(self, input_index: int = 0) -> OpenMaya.MPlug:
+        return self._plug((kInputTarget, input_index), lambda: input_target_plug(self.node, input_index))
+
+    def group_plug(self, target_index: int, input_index: int = 0) -> OpenMaya.MPlug:
+        getter = lambda: self.input_plug(input_index).child(kInputTargetGroup).elementByLogicalIndex(target_index)
+        return self._plug(("group", input_index, target_index), getter)
+
+    def item_plug(self, target_index: int, input_index: int = 0,
+                  weight_index: int = kDefaultWeightId) -> OpenMaya.MPlug:
+        getter = lambda: self.group_plug(target_index, input_index).child(kInputTargetItem).elementByLogicalIndex(
+            weight_index)
+        return self._plug(("item", input_index, target_index, weight_index), getter)
+
+    def item_child(self, target_index: int, child: int, input_index: int = 0,
+                   weight_index: int = kDefaultWeightId) -> OpenMaya.MPlug:
+        getter = lambda: self.item_plug(target_index, input_index, weight_index).child(child)
+        return self._plug(("item_child", child, input_index, target_index, weight_index), getter)
+
+    def group_child(self, target_index: int, child: int, input_index: int = 0) -> OpenMaya.MPlug:
+        getter = lambda: self.group_plug(target_index, input_index).child(child)
+        return self._plug(("group_child", child, input_index, target_index), getter)
+
+    def _read_aliases(self):
+        self._indices = list(self.weight_plug().getExistingArrayAttributeIndices())
+        self._names = {x: "" for x in self._indices}
+        for alias, plug_name in OpenMaya.MFnDependencyNode(self.node).getAliasList():
+            match = kWeightAlias.match(plug_name)
+            if match and int(match.group(1)) in self._names:
+                self._names[int(match.group(1))] = alias
+        self._name_indices = {name: index for index, name in self._names.items() if name}
+
+    def indices(self) -> list:
+        """!@Brief Get existing target indices."""
+        if self._indices is None:
+            self._read_aliases()
+        return self._indices
+
+    def names(self) -> list:
+        """!@Brief Get weight alias of each target, indices order."""
+        if self._names is None:
+            self._read_aliases()
+        return [self._names[x] for x in self._indices]
+
+    def name(self, target_index: int) -> str:
+        if self._names is None:
+            self._read_aliases()
+        return self._names[target_index]
+
+    def index(self, name: str) -> int:
+        """!@Brief Get target index from weight alias."""
+        if self._name_indices is None:
+            self._read_aliases()
+        if name not in self._name_indices:
+            raise RuntimeError(f"Target {name} not found !")
+
+        return self._name_indices[name]
+
+
+_plug_caches = {}
+
+
+def plug_cache(node: OpenMaya.MObject) -> TargetPlugCache:
+    """!@Brief Get TargetPlugCache shared by all callers of node, created on first call.
+               Caches of deleted nodes are released here.
+    """
+    for key in [k for k, v in _plug_caches.items() if not v.is_valid()]:
+        _plug_caches.pop(key)._remove_callbacks()
+
+    key = OpenMaya.MObjectHandle(node).hashCode()
+    cache = _plug_caches.get(key)
+    if cache is None or cache.node != node:
+        cache = TargetPlugCache(node)
+        _plug_caches[key] = cache
+
+    return cache
+
+
+def _target_dirty(node: OpenMaya.MObject, plug: OpenMaya.MPlug, tracker_ref: weakref.ref):
+    tracker = tracker_ref()
+    if tracker is None:
+        OpenMaya.MMessage.removeCallback(OpenMaya.MMessage.currentCallbackId())
+        return
+    tracker.mark(target_index_from_plug(plug))
+
+
+class DirtyTargets(object):
+
+    """!@Brief Track targets changed since last clear with a node dirty plug callback.
+               saved_path is the file written at last clear, used for incremental save (see blendShapeData.save).
+    """
+
+    def __init__(self, node: OpenMaya.MObject):
+        self._handle = OpenMaya.MObjectHandle(node)
+        self._targets = set()
+        self._saved_path = None
+        self._callback_id = OpenMaya.MNodeMessage.addNodeDirtyPlugCallback(node, _target_dirty, weakref.ref(self))
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(targets: {sorted(self._targets)}, saved_path: {self._saved_path})"
+
+    def __del__(self):
+        self.remove_callback()
+
+    @property
+    def node(self) -> OpenMaya.MObject:
+        return self._handle.object()
+
+    @property
+    def saved_path(self) -> Optional[str]:
+        return self._saved_path
+
+    def remove_callback(self):
+        if self._callback_id is not None:
+            try:
+                OpenMaya.MMessage.removeCallback(self._callback_id)
+            except RuntimeError:
+                pass
+            self._callback_id = None
+
+    def mark(self, target_index: Optional[int]):
+        if target_index is not None:
+            self._targets.add(target_index)
+
+    def targets(self) -> set:
+        return set(self._targets)
+
+    def is_dirty(self, target_index: int) -> bool:
+        return target_index in self._targets
+
+    def clear(self, saved_path: Optional[str | Path] = None):
+        """!@Brief Mark all targets clean, data was saved to saved_path (None if not saved in archive)."""
+        self._targets.clear()
+        self._saved_path = str(saved_path) if saved_path else None
+
+
+def component_list_data(vertex_ids: np.ndarray | list) -> OpenMaya.MObject:
+    """!@Brief Build component list data from vertex indices with one addElements call."""
+    single_component = OpenMaya.MFnSingleIndexedComponent()
+    component = single_component.create(OpenMaya.MFn.kMeshVertComponent)
+    single_component.addElements(np.asarray(vertex_ids, dtype=np.int32).ravel().tolist())
+
+    component_data = OpenMaya.MFnComponentListData()
+    output = component_data.create()
+    component_data.add(component)
+
+    return output
+
+
+def point_array_data(offsets: np.ndarray | list) -> OpenMaya.MObject:
+    """!@Brief Build point array data from (N, 3) offsets with one MPointArray constructor call."""
+    offsets = np.asarray(offsets, dtype=np.float64).reshape(-1, 3)
+    points = np.ones((len(offsets), 4), dtype=np.float64)
+    points[:, :3] = offsets
+
+    return OpenMaya.MFnPointArrayData().create(OpenMaya.MPointArray(points))
+
+
+def write_target(node: OpenMaya.MObject, target_index: int, vertex_ids: np.ndarray | list,
+                 offsets: np.ndarray | list, input_index: int = 0, weight_index: int = kDefaultWeightId,
+                 modifier: Optional[OpenMaya.MDGModifier] = None):
+    """!@Brief Write target components and offsets.
+               With modifier values are only queued, call modifier.doIt() to apply them.
+    """
+    cache = plug_cache(node)
+    component_plug = cache.item_child(target_index, kInputComponentsTarget, input_index, weight_index)
+    points_plug = cache.item_child(target_index, kInputPointsTarget, input_index, weight_index)
+    components = component_list_data(vertex_ids)
+    points = point_array_data(offsets)
+
+    if modifier is None:
+        component_plug.setMObject(components)
+        points_plug.setMObject(points)
+    else:
+        modifier.newPlugValue(component_plug, components)
+        modifier.newPlugValue(points_plug, points)
+
+
+def write_targets(node: OpenMaya.MObject, targets, input_index: int = 0,
+                  weight_index: int = kDefaultWeightId, single_modifier: bool = True) -> Optional[OpenMaya.MDGModifier]:
+    """!@Brief Write many targets. targets is an iterable of (target index, vertex ids, offsets).
+               With single_modifier all targets are written in one MDGModifier, returned for undo.
+    """
+    modifier = OpenMaya.MDGModifier() if single_modifier else None
+    for target_index, vertex_ids, offsets in targets:
+        write_target(node, target_index, vertex_ids, offsets, input_index=input_index,
+                     weight_index=weight_index, modifier=modifier)
+
+    if modifier is not None:
+        modifier.doIt()
+
+    return modifier
+
+
+class SuspendTargetConnections(ContextDecorator):
+
+    """!@Brief Disconnect target geometries in one MDGModifier and restore them on exit.
+               Without live connection the blendShape bakes inputPointsTarget and inputComponentsTarget.
+    """
+
+    def __init__(self, node: OpenMaya.MObject, targets: list, input_index: int = 0,
+                 weight_index: int = kDefaultWeightId):
+        super().__init__()
+        self._node = node
+        self._targets = targets
+        self._input_index = input_index
+        self._weight_index = weight_index
+        self._modifier = None
+
+    def __enter__(self):
+        self._modifier = OpenMaya.MDGModifier()
+        connected = False
+        cache = plug_cache(self._node)
+        for target_index in self._targets:
+            geometry = cache.item_child(target_index, kInputGeomTarget, self._input_index, self._weight_index)
+            source = geometry.source()
+            if not source.isNull:
+                self._modifier.disconnect(source, geometry)
+                connected = True
+
+        if connected:
+            self._modifier.doIt()
+        else:
+            self._modifier = None
+
+        return self
+
+    def __exit__(self, *args):
+        if self._modifier is not None:
+            self._modifier.undoIt()
+            self._modifier = None
+
+        return super().__exit__(*args)
+
+
+def _read_components(plug: OpenMaya.MPlug) -> np.ndarray:
+    if plug.isDefaultValue():
+        return np.zeros(0, dtype=np.int32)
+
+    component_data = OpenMaya.MFnComponentListData(plug.asMObject())
+    indices = []
+    for i in range(component_data.length()):
+        single_component = OpenMaya.MFnSingleIndexedComponent(component_data.get(i))
+        if not single_component.isEmpty:
+            indices.append(np.array(single_component.getElements(), dtype=np.int32))
+
+    return np.concatenate(indices) if indices else np.zeros(0, dtype=np.int32)
+
+
+def _read_offsets(plug: OpenMaya.MPlug) -> np.ndarray:
+    if plug.isDefaultValue():
+        return np.zeros((0, 3), dtype=np.float64)
+
+    points = OpenMaya.MFnPointArrayData(plug.asMObject()).array()
+    return np.array(points, dtype=np.float64).reshape(-1, 4)[:, :3]
+
+
+def read_targets(node: OpenMaya.MObject, targets: Optional[list] = None, input_index: int = 0,
+                 weight_index: int = kDefaultWeightId) -> dict:
+    """!@Brief Read components and offsets of many targets in one pass.
+               Live target connections are suspended once for all targets.
+               Return {target index: (vertex ids (N,) int32, offsets (N, 3) float64)}.
+    """
+    if targets is None:
+        targets = target_indices(node, input_index)
+
+    output = {}
+    cache = plug_cache(node)
+    with SuspendTargetConnections(node, targets, input_index=input_index, weight_index=weight_index):
+        for target_index in targets:
+            vertex_ids = _read_components(cache.item_child(target_index, kInputComponentsTarget,
+                                                           input_index, weight_index))
+            offsets = _read_offsets(cache.item_child(target_index, kInputPointsTarget, input_index, weight_index))
+            if len(vertex_ids) == 0 and len(offsets):
+                vertex_ids = np.arange(len(offsets), dtype=np.int32)
+            output[target_index] = (vertex_ids, offsets)
+
+    return output
+
+
+def target_points(base_points: np.ndarray, vertex_ids: np.ndarray, offsets: np.ndarray,
+                  epsilon: float = 0.0) -> np.ndarray:
+    """!@Brief Get target positions (V, 3) from base points and sparse offsets."""
+    points = np.array(base_points, dtype=np.float64)
+    if epsilon > 0.0:
+        mask = np.linalg.norm(offsets, axis=1) >= epsilon
+        vertex_ids, offsets = vertex_ids[mask], offsets[mask]
+    points[np.asarray(vertex_ids, dtype=np.int64)] += offsets
+
+    return points
+
+
+def mesh_points(mesh: OpenMaya.MObject | OpenMaya.MDagPath, space: int = OpenMaya.MSpace.kObject) -> np.ndarray:
+    """!@Brief Get points (V, 3) of mesh. World space need a MDagPath."""
+    points = OpenMaya.MFnMesh(mesh).getPoints(space)
+    return np.array(points, dtype=np.float64).reshape(-1, 4)[:, :3]
+
+
+def blend_matrices(weights: SparseWeights, matrices: np.ndarray) -> np.ndarray:
+    """!@Brief Get linear blend matrix of each vertex (V, 4, 4) = sum(w_vi * M_i)."""
+    contributions = np.einsum("n,njk->njk", weights.values, matrices[weights.indices])
+    summed = np.zeros((weights.nnz + 1, 4, 4), dtype=np.float64)
+    np.cumsum(contributions, axis=0, out=summed[1:])
+
+    return summed[weights.indptr[1:]] - summed[weights.indptr[:-1]]
+
+
+def invert_skinning(points: np.ndarray, weights: SparseWeights, matrices: np.ndarray,
+                    tolerance: float = 1e-10) -> np.ndarray:
+    """!@Brief Get pre skin points (V, 3) of skinned points with linear blend skinning.
+               matrices are bindPreMatrix * matrix (I, 4, 4) in row vector convention: p' = p . sum(w_i * M_i).
+               Vertices with a singular blend matrix keep their points.
+    """
+    blended = blend_matrices(weights, matrices)
+    singular = np.abs(np.linalg.det(blended)) < tolerance
+    blended[singular] = np.eye(4)
+
+    homogeneous = np.ones((len(points), 4, 1), dtype=np.float64)
+    homogeneous[:, :3, 0] = points
+    output = np.linalg.solve(np.transpose(blended, (0, 2, 1)), homogeneous)[:, :, 0]
+
+    return output[:, :3] / output[:, 3:]
+
+
+def create_meshes(base: OpenMaya.MObject, names: list, points) -> list:
+    """!@Brief Create one mesh per name with base topology and uvs, read once and shared by all meshes.
+               points is an iterable of (V, 3) arrays. Return transform objects.
+    """
+    base_mesh = OpenMaya.MFnMesh(base)
+    counts, connects = base_mesh.getVertices()
+    u, v = base_mesh.getUVs()
+    uv_counts, uv_ids = base_mesh.getAssignedUVs()
+
+    output = []
+    for name, target in zip(names, points):
+        homogeneous = np.ones((len(target), 4), dtype=np.float64)
+        homogeneous[:, :3] = target
+        mesh = OpenMaya.MFnMesh()
+        transform = mesh.create(OpenMaya.MPointArray(homogeneous), counts, connects, uValues=u, vValues=v)
+        if len(uv_ids):
+            mesh.assignUVs(uv_counts, uv_ids)
+        OpenMaya.MFnDagNode(transform).setName(name)
+        output.append(transform)
+
+    return output
+
+
+def connect_meshes(node: OpenMaya.MObject, meshes: list, targets: list, input_index: int = 0,
+                   weight_index: int = kDefaultWeightId) -> OpenMaya.MDGModifier:
+    """!@Brief Connect meshes (transform or shape) to target geometries in one MDGModifier."""
+    modifier = OpenMaya.MDGModifier()
+    cache = plug_cache(node)
+    for mesh, target_index in zip(meshes, targets):
+        path = OpenMaya.MDagPath.getAPathTo(mesh)
+        path.extendToShape()
+        world_mesh = OpenMaya.MFnDependencyNode(path.node()).findPlug(kWorldMesh, False).elementByLogicalIndex(0)
+        modifier.connect(world_mesh, cache.item_child(target_index, kInputGeomTarget, input_index, weight_index))
+    modifier.doIt()
+
+    return modifier
+
+
+def write_point_cache(path: str | Path, base_points: np.ndarray, names: list, targets: list, data: dict,
+                      epsilon: float = 0.0) -> int:
+    """!@Brief Write all target positions in one binary file, one (T, V, 3) float32 block.
+               data is {target index: (vertex ids, offsets)}. Return file size.
+    """
+    points = np.empty((len(targets), len(base_points), 3), dtype=np.float32)
+    for i, target_index in enumerate(targets):
+        points[i] = target_points(base_points, *data[target_index], epsilon=epsilon)
+
+    return binaryFile.write(path, {kNames: list(names), kTargets: [int(x) for x in targets]}, {kPoints: points})
+
+
+def refresh_targets(node: OpenMaya.MObject, targets: list, input_index: int = 0,
+                    weight_index: int = kDefaultWeightId) -> Optional[OpenMaya.MDGModifier]:
+    """!@Brief Disconnect and reconnect connected target geometries in one modifier pass.
+               Return modifier for undo, None if no target is connected.
+    """
+    modifier = OpenMaya.MDGModifier()
+    connections = []
+    cache = plug_cache(node)
+    for target_index in targets:
+        geometry = cache.item_child(target_index, kInputGeomTarget, input_index, weight_index)
+        source = geometry.source()
+        if not source.isNull:
+            connections.append((source, geometry))
+    if not connections:
+        return None
+
+    for source, geometry in connections:
+        modifier.disconnect(source, geometry)
+    for source, geometry in connections:
+        modifier.connect(source, geometry)
+    modifier.doIt()
+
+    return modifier
+
+
+def _target_weights_plug(node: OpenMaya.MObject, target_index: int, input_index: int = 0) -> OpenMaya.MPlug:
+    return plug_cache(node).group_child(target_index, kTargetWeights, input_index)
+
+
+def read_target_weights(node: OpenMaya.MObject, targets: list, vertex_count: int, input_index: int = 0) -> dict:
+    """!@Brief Read dense target weights {target index: (V,) array}, vertices never painted are 1.0.
+               targetWeights is a sparse multi, existing elements are read with one getAttr per target.
+    """
+    output = {}
+    for target_index in targets:
+        plug = _target_weights_plug(node, target_index, input_index)
+        weights = np.ones(vertex_count, dtype=np.float64)
+        ids = np.array(plug.getExistingArrayAttributeIndices(), dtype=np.int64)
+        if len(ids):
+            values = np.array(cmds.getAttr(plug.name()), dtype=np.float64).reshape(-1)
+            if len(values) != len(ids):
+                raise RuntimeError(f"Target {target_index}: {len(values)} weights read for {len(ids)} elements !")
+            mask = ids < vertex_count
+            weights[ids[mask]] = values[mask]
+        output[target_index] = weights
+
+    return output
+
+
+def _set_target_weights(plug: OpenMaya.MPlug, vertex_ids: np.ndarray, values: np.ndarray):
+    """!@Brief Set targetWeights elements with one setAttr over the painted range.
+               Only vertices with a weight other than 1.0 and already existing elements are written,
+               every other vertex of the range is set to 1.0.
+    """
+    existing = np.array(plug.getExistingArrayAttributeIndices(), dtype=np.int64)
+    ids = np.union1d(vertex_ids[values != 1.0], existing)
+    if len(ids) == 0:
+        return
+
+    start, end = int(ids[0]), int(ids[-1])
+    dense = np.ones(end - start + 1, dtype=np.float64)
+    mask = (vertex_ids >= start) & (vertex_ids <= end)
+    dense[vertex_ids[mask] - start] = values[mask]
+    cmds.setAttr(f"{plug.name()}[{start}:{end}]", *dense.tolist())
+
+
+def write_target_weights(node: OpenMaya.MObject, weights: dict, input_index: int = 0):
+    """!@Brief Write dense target weights {target index: (V,) array}, one setAttr per target (undoable)."""
+    for target_index, values in weights.items():
+        values = np.asarray(values, dtype=np.float64).reshape(-1)
+        _set_target_weights(_target_weights_plug(node, target_index, input_index),
+                            np.arange(len(values), dtype=np.int64), values)
+
+
+def restore_target_weights(node: OpenMaya.MObject, data: dict, input_index: int = 0):
+    """!@Brief Restore target weights {target index: (vertex ids, weights)}, weights are parallel to vertex ids
+               (see blendShapeArchive). Targets without weights are skipped, other vertices are set to 1.0.
+    """
+    for target_index, (vertex_ids, values) in data.items():
+        values = np.asarray(values, dtype=np.float64).reshape(-1)
+        vertex_ids = np.asarray(vertex_ids, dtype=np.int64).reshape(-1)
+        if len(values) == 0:
+            continue
+        if len(values) != len(vertex_ids):
+            raise ValueError(f"Target {target_index}: {len(values)} weights for {len(vertex_ids)} vertices !")
+        _set_target_weights(_target_weights_plug(node, target_index, input_index), vertex_ids, values)
+
+
+def offset_weights(vertex_ids: np.ndarray, offsets: np.ndarray, vertex_count: int) -> np.ndarray:
+    """!@Brief Get dense target weights from offset lengths, normalized by the longest offset."""
+    lengths = np.round(np.linalg.norm(offsets, axis=1), 3)
+    weights = np.zeros(vertex_count, dtype=np.float64)
+    length_max = lengths.max(initial=0.0)
+    if length_max > 0.0:
+        weights[vertex_ids] = lengths / length_max
+
+    return weights
+
+
+def refresh_target_weights(node: OpenMaya.MObject, targets: list, vertex_count: int, input_index: int = 0,
+                           weight_index: int = kDefaultWeightId):
+    """!@Brief Set target weights of many targets from their offset lengths."""
+    data = read_targets(node, targets, input_index=input_index, weight_index=weight_index)
+    weights = {target_index: offset_weights(vertex_ids, offsets, vertex_count)
+               for target_index, (vertex_ids, offsets) in data.items()}
+
+    write_target_weights(node, weights, input_index=input_index)
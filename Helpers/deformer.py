@@ -49,8 +49,30 @@ class Deformer(object):
         if not self.valid_shape(shapes[0]):
             raise RuntimeError("No valid shape given !")
 
-        self._shape = Node.get(shapes[0])
-        self._shape_data = self._shape.to_dict()
+        self._set_shape(Node.get(shapes[0]))
+
+    def _set_shape(self, shape: Node):
+        """!@Brief Set deformed shape. Shape data is only computed when needed."""
+        if self._shape is not None and hasattr(self._shape, "topology_changed"):
+            self._shape.topology_changed.unregister(self._on_topology_changed)
+
+        self._shape = shape
+        self._shape_data = None
+        if shape is not None and hasattr(shape, "topology_changed"):
+            shape.topology_changed.register(self._on_topology_changed)
+
+    def _on_topology_changed(self, *args):
+        self._shape_data = None
+
+    @property
+    def shape_data(self) -> dict:
+        """!@Brief Shape topology data, computed on first access and kept until topology change."""
+        return self.get_shape_data()
+
+    def get_shape_data(self, refresh: bool = False) -> dict:
+        if self._shape is not None and (self._shape_data is None or refresh):
+            self._shape_data = self._shape.to_dict()
+        return self._shape_data
 
     @property
     def name(self) -> str:
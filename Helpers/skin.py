@@ -1,19 +1,128 @@
 from __future__ import annotations
 
+from functools import partial
 import json
 import os
-from typing import Optional
+from typing import Callable, Optional
+import weakref
+
+import numpy as np
 
 from maya import cmds
 from maya.api import OpenMaya, OpenMayaAnim
 
-from ..Core import math
+from ..Core import apiUndo, binaryFile, constants, math
+from ..Core.decorator import ContextDecorator
 from ..Helpers import utils
 from ..Core.logger import log
 from ..Helpers.deformer import Deformer
+from ..Helpers.skinWeights import SparseWeights
 from ..Nodes.node import Node
 
 
+def _short_name(name: str) -> str:
+    return name.split("|")[-1].split(":")[-1]
+
+
+class InfluenceIndex(object):
+
+    """!@Brief Short name to full path index of a joint hierarchy."""
+
+    def __init__(self, root: str | OpenMaya.MObject | OpenMaya.MDagPath):
+        if isinstance(root, str):
+            root = utils.get_object(root)
+        if isinstance(root, OpenMaya.MDagPath):
+            root = root.node()
+
+        self._root = utils.name(root)
+        self._paths = {}
+        self._duplicates = set()
+
+        children = cmds.listRelatives(self._root, allDescendents=True, fullPath=True, type='joint') or list()
+        children.append(self._root)
+        for child in children:
+            short_name = _short_name(child)
+            if short_name in self._paths:
+                self._duplicates.add(short_name)
+            else:
+                self._paths[short_name] = child
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(root: {self._root}, count: {len(self._paths)})"
+
+    @property
+    def root(self) -> str:
+        return self._root
+
+    def resolve(self, names: list) -> list:
+        """!@Brief Get full path of given influence names. Report all missing and duplicated joints at once."""
+        output = []
+        missing = []
+        duplicates = []
+        for name in names:
+            short_name = _short_name(name)
+            if short_name in self._duplicates:
+                duplicates.append(short_name)
+            elif short_name not in self._paths:
+                missing.append(short_name)
+            else:
+                output.append(self._paths[short_name])
+
+        errors = []
+        if missing:
+            errors.append("Influences not found: {0}".format(", ".join(missing)))
+        if duplicates:
+            errors.append("Multi node found with short names: {0}".format(", ".join(duplicates)))
+        if errors:
+            raise RuntimeError(" | ".join(errors))
+
+        return output
+
+    @classmethod
+    def get(cls, root: str | OpenMaya.MObject | OpenMaya.MDagPath) -> "InfluenceIndex":
+        """!@Brief Get index of hierarchy. Index is reused inside InfluenceIndexCache context."""
+        if not InfluenceIndexCache.kDepth:
+            return cls(root)
+
+        if isinstance(root, str):
+            root = utils.get_object(root)
+        if isinstance(root, OpenMaya.MDagPath):
+            root = root.node()
+        key = utils.node_hash(root)
+        if key not in InfluenceIndexCache.kCache:
+            InfluenceIndexCache.kCache[key] = cls(root)
+
+        return InfluenceIndexCache.kCache[key]
+
+
+class InfluenceIndexCache(ContextDecorator):
+
+    """!@Brief Keep joint hierarchy index between Skin.read calls.
+               Use it around batch loads, skeleton must not change inside context.
+    """
+
+    kDepth = 0
+    kCache = {}
+
+    def __enter__(self):
+        InfluenceIndexCache.kDepth += 1
+
+    def __exit__(self, *args):
+        InfluenceIndexCache.kDepth = max(InfluenceIndexCache.kDepth - 1, 0)
+        if InfluenceIndexCache.kDepth == 0:
+            InfluenceIndexCache.kCache.clear()
+
+        return super().__exit__(*args)
+
+
+def _skin_attribute_changed(msg: int, plug: OpenMaya.MPlug, other_plug: OpenMaya.MPlug, skin_ref: weakref.ref):
+    skin = skin_ref()
+    if skin is None:
+        OpenMaya.MMessage.removeCallback(OpenMaya.MMessage.currentCallbackId())
+        return
+    skin._on_attribute_changed(msg, plug)
+
+
 class Skin(Deformer):
 
     kName = "name"
@@ -35,17 +144,41 @@ class Skin(Deformer):
     kShapeData = "shapeData"
     kShapeType = "shapeType"
 
+    kFormat = "format"
+    kFormatVersion = 2
+    kVertexCount = "vertexCount"
+    kBlockSize = "blockSize"
+    kBlockIds = "blockIds"
+    kBlockHashes = "blockHashes"
+    kDeltaBlockSize = 1024
+    kPatchExtension = "patch"
+    kShapeBlocks = (constants.kPoints, constants.kPolygonCounts, constants.kPolygonConnects)
+    kShapeBlockTypes = (np.float64, np.int32, np.int32)
+
     kApiType = OpenMaya.MFn.kSkinClusterFilter
+    kChunkSize = 20000
+    kBindPreMatrix = "bindPreMatrix"
+    kMatrix = "matrix"
+    kWeightPlugs = ("weightList", "weights")
+    kStructureMessages = (OpenMaya.MNodeMessage.kAttributeArrayAdded |
+                          OpenMaya.MNodeMessage.kAttributeArrayRemoved |
+                          OpenMaya.MNodeMessage.kConnectionMade |
+                          OpenMaya.MNodeMessage.kConnectionBroken)
+    kChangeMessages = OpenMaya.MNodeMessage.kAttributeSet | kStructureMessages
 
     def __init__(self, node: Optional[str | OpenMaya.MObject] = None, **kwargs):
 
+        self._callback_id = None
+        self._settings_dirty = True
+        self._weights_dirty = True
+
         self._shape_namespace = ""
         self._joint_namespace = ""
 
         self._influences_ids = list()
         self._influences_names = list()
-        self._weights = OpenMaya.MDoubleArray()
-        self._bind_matrix = list()
+        self._weights = SparseWeights()
+        self._bind_matrix = np.zeros((0, 4, 4))
 
         self._skinning_method = 0
         self._use_components = False
@@ -65,18 +198,25 @@ class Skin(Deformer):
                                                                          self._shape.name if self._shape else '',
                                                                          self.influence_count())
 
+    def __del__(self):
+        self._remove_callback()
+
     def _clear(self):
         """!@Brief Clear instance."""
 
-        self._shape = None
-        self._shape_data = None
+        self._remove_callback()
+        self._settings_dirty = True
+        self._weights_dirty = True
+
+        self._set_shape(None)
 
         self._shape_namespace = ""
         self._joint_namespace = ""
 
         self._influences_ids = list()
         self._influences_names = list()
-        self._weights = list()
+        self._weights = SparseWeights()
+        self._bind_matrix = np.zeros((0, 4, 4))
 
         self._skinning_method = 0
         self._use_components = False
@@ -101,28 +241,73 @@ class Skin(Deformer):
         return self._shape
 
     @property
-    def shape_data(self) -> dict:
-        return self._shape_data 
-    
-    @property
-    def weights(self):
+    def weights(self) -> SparseWeights:
+        return self._weights
+
+    def to_sparse(self) -> SparseWeights:
         return self._weights
 
-    def get_influence_weights(skn):
-        # ToDo transform to this lib
-        influences = [x.split("|")[-1].split("|")[-1] for x in skn.influences_names]
-        weights = skn.weights()
-        inf_count = len(influences)
-        vtx_count = int(weights.length() / skn.influences_count())
+    def from_sparse(self, weights: SparseWeights):
+        if weights.influence_count != self.influence_count():
+            raise ValueError(f"Influence count mismatch {weights.influence_count} != {self.influence_count()} !")
+        self._weights = weights
+
+    def influence_index(self, influence: int | str) -> int:
+        """!@Brief Get influence index from index, full path or short name."""
+        if isinstance(influence, (int, np.integer)):
+            if not 0 <= influence < self.influence_count():
+                raise IndexError(f"Influence index {influence} out of range !")
+            return int(influence)
+
+        if influence in self._influences_names:
+            return self._influences_names.index(influence)
+        short_names = [_short_name(x) for x in self._influences_names]
+        short_name = _short_name(influence)
+        if short_name not in short_names:
+            raise RuntimeError(f"Influence {influence} not found on {self.name} !")
+
+        return short_names.index(short_name)
+
+    def weight_array(self, vertex_ids: Optional[list | np.ndarray] = None) -> np.ndarray:
+        """!@Brief Get dense (vertex, influence) weights of all or given vertices."""
+        weights = self._weights if vertex_ids is None else self._weights.rows(vertex_ids)
+        return weights.to_dense()
+
+    def influence_column(self, influence: int | str) -> np.ndarray:
+        """!@Brief Get weights of one influence for all vertices."""
+        return self._weights.column(self.influence_index(influence))
+
+    def influences_above(self, vertex_ids: list | np.ndarray, tolerance: float = 1e-4) -> np.ndarray:
+        """!@Brief Get sorted influence indices with a weight above tolerance on given vertices."""
+        weights = self._weights.rows(vertex_ids)
+        return np.unique(weights.indices[weights.values > tolerance])
+
+    def influence_counts(self, tolerance: float = 0.0) -> np.ndarray:
+        """!@Brief Get influence count of each vertex."""
+        return self._weights.counts(tolerance=tolerance)
 
-        data = {x: [0.0] * vtx_count for x in influences}
+    @property
+    def bind_matrices(self) -> np.ndarray:
+        """!@Brief bindPreMatrix (influence, 4, 4), same order as influences."""
+        return self._bind_matrix
 
-        for j in range(vtx_count):
-            for i, influence in enumerate(influences):
-                weight_id = int((j * inf_count) + i)
-                data[influence][j] = weights[weight_id]
+    def influence_matrices(self) -> np.ndarray:
+        """!@Brief Get current influence matrices (influence, 4, 4) from matrix plugs."""
+        self._update_data(get_weights=False)
+        matrix_plug = OpenMaya.MFnDependencyNode(self._object).findPlug(self.kMatrix, False)
+        matrices = np.zeros((self.influence_count(), 4, 4))
+        for i, influence_id in enumerate(self._influences_ids):
+            matrix_data = matrix_plug.elementByLogicalIndex(influence_id).asMObject()
+            matrices[i] = np.array(OpenMaya.MFnMatrixData(matrix_data).matrix()).reshape(4, 4)
 
-        return data
+        return matrices
+
+    def skinning_matrices(self) -> np.ndarray:
+        """!@Brief Get bindPreMatrix * matrix of each influence (row vector convention)."""
+        return np.matmul(self.bind_matrices, self.influence_matrices())
+
+    def get_influence_weights(self) -> dict:
+        return {_short_name(x): self._weights.column(i).tolist() for i, x in enumerate(self._influences_names)}
 
     def add_joint(self, name: str, pos: Optional[list | OpenMaya.MVector | OpenMaya.MPoint] = None,
                   parent: Optional[str | OpenMaya.MObject] = None, build: bool = False) -> OpenMaya.MObject:
@@ -165,11 +350,18 @@ class Skin(Deformer):
 
         return new_joint
 
-    def apply(self, normalize: bool = False, weights: OpenMaya.MDoubleArray = None):
+    def apply(self, normalize: bool = False, weights: Optional[SparseWeights | OpenMaya.MDoubleArray] = None,
+              chunk_size: Optional[int] = None, undo: bool = False,
+              progress: Optional[Callable[[int, int], None]] = None) -> Optional[SparseWeights]:
+        """!@Brief Apply weights on skinCluster by vertex chunks.
+                   chunk_size 0 write all vertices in one call.
+                   progress is called with (written vertex count, vertex count) after each chunk.
+        """
         if self.is_empty():
             raise Exception("Impossible to apply weights on empty instance.")
 
-        return self._set_weights(normalize=normalize, weights=weights)
+        return self._set_weights(normalize=normalize, weights=weights,
+                                 chunk_size=chunk_size, undo=undo, progress=progress)
     
     def bind(self):
         if not self._shape:
@@ -205,21 +397,72 @@ class Skin(Deformer):
         if not self.is_skin(node):
             raise TypeError(f"Node must be a SkinCluster not {self._object.apiTypeStr()} !")
 
-        name = self.name
-        self._skinning_method = cmds.getAttr('{0}.{1}'.format(name, self.kSkinningMethod))
-        self._use_components = cmds.getAttr('{0}.{1}'.format(name, self.kUseComponents))
-        self._deform_user_normals = cmds.getAttr('{0}.{1}'.format(name, self.kDeformUserNormals))
-        self._dqs_support_non_rigid = cmds.getAttr('{0}.{1}'.format(name, self.kDqsSupportNonRigid))
-        self._dqs_scale = cmds.getAttr('{0}.{1}'.format(name, self.kDqsScale))
-        self._normalize_weights = cmds.getAttr('{0}.{1}'.format(name, self.kNormalizeWeights))
-        self._weight_distribution = cmds.getAttr('{0}.{1}'.format(name, self.kWeightDistribution))
-        self._max_influences = cmds.getAttr('{0}.{1}'.format(name, self.kMaxInfluences))
-        self._maintain_max_influences = cmds.getAttr('{0}.{1}'.format(name, self.kMaintainMaxInfluences))
-        self._bind_matrix = [cmds.getAttr('{0}.bindPreMatrix[{1}]'.format(name, i)) for i in range(self.influence_count())]
-        self._influences_ids, self._influences_names = self._get_influences()
+        self._install_callback()
+        self._read_settings()
         if get_weights:
-            self._weights = self.get_weights()
-    
+            self._read_weights()
+
+    def _read_settings(self):
+        """!@Brief Read influences, scalar settings and all bindPreMatrix in one pass with plugs."""
+        self._influences_ids, self._influences_names = self._get_influences()
+
+        mfn = OpenMaya.MFnDependencyNode(self._object)
+        self._skinning_method = mfn.findPlug(self.kSkinningMethod, False).asInt()
+        self._use_components = mfn.findPlug(self.kUseComponents, False).asBool()
+        self._deform_user_normals = mfn.findPlug(self.kDeformUserNormals, False).asBool()
+        self._dqs_support_non_rigid = mfn.findPlug(self.kDqsSupportNonRigid, False).asBool()
+        dqs_scale = mfn.findPlug(self.kDqsScale, False)
+        self._dqs_scale = [dqs_scale.child(i).asDouble() for i in range(dqs_scale.numChildren())]
+        self._normalize_weights = mfn.findPlug(self.kNormalizeWeights, False).asInt()
+        self._weight_distribution = mfn.findPlug(self.kWeightDistribution, False).asInt()
+        self._max_influences = mfn.findPlug(self.kMaxInfluences, False).asInt()
+        self._maintain_max_influences = mfn.findPlug(self.kMaintainMaxInfluences, False).asBool()
+
+        bind_plug = mfn.findPlug(self.kBindPreMatrix, False)
+        self._bind_matrix = np.zeros((self.influence_count(), 4, 4))
+        for i, influence_id in enumerate(self._influences_ids):
+            matrix_data = bind_plug.elementByLogicalIndex(influence_id).asMObject()
+            self._bind_matrix[i] = np.array(OpenMaya.MFnMatrixData(matrix_data).matrix()).reshape(4, 4)
+
+        self._settings_dirty = False
+
+    def _read_weights(self):
+        self._weights = SparseWeights.from_dense(self.get_weights(), self.influence_count())
+        self._weights_dirty = False
+
+    def _update_data(self, get_weights: bool = True):
+        """!@Brief Read again only data changed since last read."""
+        if self._settings_dirty:
+            self._read_settings()
+            self._weights_dirty = True
+        if get_weights and self._weights_dirty:
+            self._read_weights()
+
+    def _install_callback(self):
+        self._remove_callback()
+        self._callback_id = OpenMaya.MNodeMessage.addAttributeChangedCallback(self._object, _skin_attribute_changed,
+                                                                              weakref.ref(self))
+
+    def _remove_callback(self):
+        if self._callback_id is not None:
+            try:
+                OpenMaya.MMessage.removeCallback(self._callback_id)
+            except RuntimeError:
+                pass
+            self._callback_id = None
+
+    def _on_attribute_changed(self, msg: int, plug: OpenMaya.MPlug):
+        """!@Brief Flag data to read again. Evaluation messages and matrix values (joint moves) are ignored,
+                   only matrix connections and elements change influences.
+        """
+        if not msg & self.kChangeMessages:
+            return
+        attribute_name = OpenMaya.MFnAttribute(plug.attribute()).name
+        if attribute_name in self.kWeightPlugs:
+            self._weights_dirty = True
+        elif attribute_name != self.kMatrix or msg & self.kStructureMessages:
+            self._settings_dirty = True
+
     def _get_influences(self) -> tuple:
         if not self._object:
             raise Exception("No SkinCluster setted")
@@ -263,7 +506,7 @@ class Skin(Deformer):
 
     def is_empty(self) -> bool:
         return self._object is None and self._shape is None and len(self._influences_ids) == 0 and \
-               len(self._influences_names) == 0 and self._weights.length() == 0
+               len(self._influences_names) == 0 and self._weights.is_empty()
 
     @classmethod
     def is_skin(cls, node: str | OpenMaya.MObject) -> bool:
@@ -282,8 +525,11 @@ class Skin(Deformer):
             raise RuntimeError('Path "{0}" does not exists !'.format(file_path))
         
         try:
-            with open(file_path, 'r') as stream:
-                data = json.load(stream)
+            if binaryFile.is_binary(file_path):
+                data = cls._read_binary(file_path)
+            else:
+                with open(file_path, 'r') as stream:
+                    data = json.load(stream)
         except Exception:
             raise RuntimeError(f"Error on read skin data {file_path} !")
         
@@ -295,43 +541,114 @@ class Skin(Deformer):
 
         return new_cls
 
+    @classmethod
+    def _read_binary(cls, file_path: str) -> dict:
+        """!@Brief Read binary skin file and rebuild data like to_dict.
+                   Weights stay memory mapped until they are given to Maya, except if patches are replayed.
+        """
+        data, blocks = binaryFile.read(file_path)
+        if data.get(cls.kFormat, 0) > cls.kFormatVersion:
+            raise RuntimeError(f"Skin format {data[cls.kFormat]} not supported !")
+
+        data[cls.kInfluencesIDs] = blocks[cls.kInfluencesIDs].tolist()
+        data[cls.kBindMatrix] = blocks[cls.kBindMatrix].reshape(-1, 16).tolist()
+        if cls.kWeights in blocks:
+            data[cls.kWeights] = SparseWeights.from_dense(blocks[cls.kWeights])
+        else:
+            weights = SparseWeights.from_blocks(cls._weight_blocks(blocks), len(data[cls.kInfluencesIDs]))
+            data[cls.kWeights] = cls._replay_patches(file_path, data, weights)
+        shape_data = data.setdefault(cls.kShapeData, {})
+        for key in cls.kShapeBlocks:
+            block_name = f"{cls.kShapeData}.{key}"
+            if block_name in blocks:
+                shape_data[key] = blocks[block_name].tolist()
+
+        return data
+
+    @classmethod
+    def _weight_blocks(cls, blocks: dict) -> dict:
+        return {k.split(".")[-1]: v for k, v in blocks.items() if k.startswith(f"{cls.kWeights}.")}
+
+    @classmethod
+    def patch_path(cls, file_path: str) -> str:
+        return f"{file_path}.{cls.kPatchExtension}"
+
+    @classmethod
+    def _replay_patches(cls, file_path: str, data: dict, weights: SparseWeights) -> SparseWeights:
+        """!@Brief Apply patch records of delta saves in order. Last settings found are kept in data."""
+        patch_path = cls.patch_path(file_path)
+        if not os.path.isfile(patch_path):
+            return weights
+
+        for patch_data, patch_blocks in binaryFile.records(patch_path):
+            patch = SparseWeights.from_blocks(cls._weight_blocks(patch_blocks), weights.influence_count)
+            weights = weights.replace_blocks(patch_data[cls.kBlockSize], patch_data[cls.kBlockIds], patch)
+            data.update({k: v for k, v in patch_data.items() if k not in (cls.kBlockIds, cls.kBlockHashes)})
+
+        return weights
+
+    @classmethod
+    def _saved_state(cls, file_path: str) -> Optional[dict]:
+        """!@Brief Get header and block hashes of saved skin with its patches, without reading weights."""
+        if not os.path.isfile(file_path) or not binaryFile.is_binary(file_path):
+            return
+        data, _, _ = binaryFile.read_header(file_path)
+        if not data.get(cls.kBlockHashes):
+            return
+
+        hashes = list(data[cls.kBlockHashes])
+        patch_path = cls.patch_path(file_path)
+        if os.path.isfile(patch_path):
+            for patch_data, _ in binaryFile.records(patch_path, load_blocks=False):
+                for block_id, block_hash in zip(patch_data[cls.kBlockIds], patch_data[cls.kBlockHashes]):
+                    hashes[block_id] = block_hash
+                data.update({k: v for k, v in patch_data.items() if k not in (cls.kBlockIds, cls.kBlockHashes)})
+        data[cls.kBlockHashes] = hashes
+
+        return data
+
+    @classmethod
+    def write_blocks(cls, file_path: str, data: dict, blocks: dict) -> int:
+        """!@Brief Write full binary skin file and remove patches of previous delta saves."""
+        size = binaryFile.write(file_path, data, blocks)
+        patch_path = cls.patch_path(file_path)
+        if os.path.isfile(patch_path):
+            os.remove(patch_path)
+
+        return size
+
+    @classmethod
+    def compact(cls, file_path: str):
+        """!@Brief Merge patches of delta saves into skin file."""
+        if not os.path.isfile(cls.patch_path(file_path)):
+            return
+
+        data, blocks = binaryFile.read(file_path, mmap=False)
+        influence_count = len(blocks[cls.kInfluencesIDs])
+        weights = SparseWeights.from_blocks(cls._weight_blocks(blocks), influence_count)
+        weights = cls._replay_patches(file_path, data, weights)
+        dtype = weights.values.dtype
+        for key, block in weights.to_blocks(dtype=dtype).items():
+            blocks[f"{cls.kWeights}.{key}"] = block
+        data[cls.kBlockHashes] = weights.block_hashes(data[cls.kBlockSize], dtype=dtype)
+        cls.write_blocks(file_path, data, blocks)
+        log.debug(f"{cls.__name__} file compacted -> {file_path}")
+
     def __retrieve_influence_from_data(self, joint_root):
         if not joint_root:
             if self._joints_namespace:
                 for i, inf in enumerate(self._influences_names):
                     self._influences_names[i] = "{0}:{1}".format(self._joints_namespace, inf)
+            self._influences_names = cmds.ls(self._influences_names, long=True)
         else:
-            if isinstance(joint_root, str):
-                joint_root = utils.get_object(joint_root)
-            if isinstance(joint_root, OpenMaya.MDagPath):
-                joint_root = joint_root.node()
-
-            root_name = utils.name(joint_root)
-            children = cmds.listRelatives(root_name, allDescendents=True, fullPath=True, type='joint') or list()
-            children.append(root_name)
-            short_names = [child.split('|')[-1].split(':')[-1] for child in children]
-
-            for i, inf in enumerate(self._influences_names):
-                inf_count = short_names.count(inf)
-                if inf_count == 0:
-                    raise RuntimeError('Influence "{0}" not found'.format(inf))
-                elif inf_count > 1:
-                    raise RuntimeError('Multi node found with short name "{0}"'.format(inf))
-                self._influences_names[i] = utils.name(children[short_names.index(inf)])
+            self._influences_names = InfluenceIndex.get(joint_root).resolve(self._influences_names)
 
     def retrieve_influences_from_vertices(self, vertex_ids: list, tolerance: float = 1e-4) -> list:
         """!@Brief Retrieve all influences from given vertices."""
         if self.is_empty():
             raise RuntimeError('Current instance is empty !')
 
-        influences = set()
-        for vertex_id in vertex_ids:
-            for inf_id in self._influences_ids:
-                weight = self._weights[vertex_id * self.influence_count() + inf_id]
-                if weight > tolerance:
-                    influences.add(inf_id)
-
-        return sorted(list(influences))
+        return [self._influences_ids[i] for i in self.influences_above(vertex_ids, tolerance=tolerance)]
 
     def __retrieve_shape_from_data(self, data):
         shape_data = data.get(self.kShapeData, None)
@@ -379,28 +696,68 @@ class Skin(Deformer):
         self._max_influences = data.get(self.kMaxInfluences, 8)
         self._maintain_max_influences = data.get(self.kMaintainMaxInfluences, True)
         self._influences_ids = data.get(self.kInfluencesIDs, list())
-        self._influences_names = cmds.ls(data.get(self.kInfluencesNames, list()), long=True)
-        self._weights = OpenMaya.MDoubleArray(data.get(self.kWeights, list()))
-        if not len(self._weights):
+        self._influences_names = list(data.get(self.kInfluencesNames, list()))
+        weights = data.get(self.kWeights, list())
+        if not isinstance(weights, SparseWeights):
+            weights = SparseWeights.from_dense(weights, len(self._influences_ids))
+        self._weights = weights
+        if self._weights.is_empty():
             raise RuntimeError('No weight data found !')
 
     def _set_weights(self, normalize: bool = False,
-                     weights: OpenMaya.MDoubleArray = None) -> OpenMaya.MDoubleArray:
-        """!@Brief Set SkinCluster weight from MOPSkinTools instance."""
+                     weights: Optional[SparseWeights | OpenMaya.MDoubleArray] = None,
+                     chunk_size: Optional[int] = None, undo: bool = False,
+                     progress: Optional[Callable[[int, int], None]] = None) -> Optional[SparseWeights]:
+        """!@Brief Set SkinCluster weight from MOPSkinTools instance.
+                   Old weights are only retrieved if undo is requested.
+        """
         if not self._object:
             raise Exception("No SkinCluster setted.")
 
-        component = self._shape.components()
-        if weights:
+        if weights is not None:
+            if not isinstance(weights, SparseWeights):
+                weights = SparseWeights.from_dense(weights, self.influence_count())
             self._weights = weights
-        influences_ids = OpenMaya.MIntArray(list(range(self.influence_count())))
 
+        old_weights = self._write_weights(self._weights, normalize=normalize, chunk_size=chunk_size,
+                                          return_old=undo, progress=progress)
+        if undo:
+            apiUndo.commit(partial(self._write_weights, old_weights, chunk_size=chunk_size),
+                           partial(self._write_weights, self._weights, normalize=normalize, chunk_size=chunk_size))
+
+        return old_weights
+
+    def _write_weights(self, weights: SparseWeights, normalize: bool = False, chunk_size: Optional[int] = None,
+                       return_old: bool = False,
+                       progress: Optional[Callable[[int, int], None]] = None) -> Optional[SparseWeights]:
+        """!@Brief Write weights by vertex chunks.
+                   Each chunk is densified alone so peak memory is bounded by chunk size,
+                   memory mapped weights are only read chunk by chunk.
+        """
+        vertex_count = weights.vertex_count
+        if chunk_size is None:
+            chunk_size = self.kChunkSize
+        if chunk_size <= 0:
+            chunk_size = vertex_count
+
+        influences_ids = OpenMaya.MIntArray(list(range(self.influence_count())))
         mfn = OpenMayaAnim.MFnSkinCluster(self._object)
-        return mfn.setWeights(self._shape.path,
-                              component,
-                              influences_ids,
-                              self._weights,
-                              normalize, returnOldWeights=True)
+        old_weights = []
+        for start in range(0, vertex_count, chunk_size):
+            end = min(start + chunk_size, vertex_count)
+            if start == 0 and end == vertex_count:
+                component = self._shape.components()
+            else:
+                component = self._shape.components(vertex_ids=range(start, end))
+            chunk = weights.slice(start, end).to_dense().ravel()
+            old = mfn.setWeights(self._shape.path, component, influences_ids,
+                                 OpenMaya.MDoubleArray(chunk), normalize, returnOldWeights=return_old)
+            if return_old:
+                old_weights.append(SparseWeights.from_dense(old, self.influence_count()))
+            if progress:
+                progress(end, vertex_count)
+
+        return SparseWeights.concatenate(old_weights) if return_old else None
 
     @classmethod
     def find(cls, node: str | OpenMaya.MObject) -> OpenMaya.MObject:
@@ -412,23 +769,113 @@ class Skin(Deformer):
         node = cls.find(node)
         return cls(node) if node else None
 
-    def to_dict(self) -> dict:
-        if self.is_empty():
-            raise Exception("Data of this instance is empty !")
-
-        self._get_data(self._object, get_weights=True)
-
-        data = {self.kName: utils.name(self._object, False, False),
+    def _header(self) -> dict:
+        return {self.kName: utils.name(self._object, False, False),
                 self.kShape: self._shape.name,
                 self.kSkinningMethod: self._skinning_method, self.kUseComponents: self._use_components,
                 self.kDeformUserNormals: self._deform_user_normals,
                 self.kDqsSupportNonRigid: self._dqs_support_non_rigid, self.kDqsScale: self._dqs_scale,
                 self.kNormalizeWeights: self._normalize_weights, self.kWeightDistribution: self._weight_distribution,
                 self.kMaxInfluences: self._max_influences, self.kMaintainMaxInfluences: self._maintain_max_influences,
-                self.kInfluencesIDs: self._influences_ids,
-                self.kInfluencesNames: [x.split("|")[-1].split(":")[-1] for x in self._influences_names],
-                self.kWeights: list(self._weights),
-                self.kShapeData: self._shape.to_dict(),
-                self.kBindMatrix: self._bind_matrix}
+                self.kInfluencesNames: [x.split("|")[-1].split(":")[-1] for x in self._influences_names]}
+
+    def to_dict(self) -> dict:
+        if self.is_empty():
+            raise Exception("Data of this instance is empty !")
+
+        self._update_data()
+
+        data = self._header()
+        data[self.kInfluencesIDs] = self._influences_ids
+        data[self.kWeights] = self._weights.to_dense().ravel().tolist()
+        data[self.kShapeData] = self.get_shape_data(refresh=True)
+        data[self.kBindMatrix] = self._bind_matrix.reshape(-1, 16).tolist()
 
         return data
+
+    def snapshot(self) -> tuple:
+        """!@Brief Get raw skin data read from scene (header, SparseWeights, influence ids, bind matrices, shape data).
+                   Only Maya reads are done here, numpy encoding is done by build_blocks and can run on any thread.
+        """
+        if self.is_empty():
+            raise Exception("Data of this instance is empty !")
+
+        self._update_data()
+
+        return (self._header(), self._weights, list(self._influences_ids), self._bind_matrix.copy(),
+                dict(self.get_shape_data(refresh=True)))
+
+    @classmethod
+    def build_blocks(cls, header: dict, weights: SparseWeights, influences_ids: list, bind_matrix: np.ndarray,
+                     shape_data: dict, dtype: type = np.float32) -> tuple:
+        """!@Brief Get json header and numpy blocks for binary file from snapshot data."""
+        data = dict(header)
+        data[cls.kFormat] = cls.kFormatVersion
+        data[cls.kVertexCount] = weights.vertex_count
+        data[cls.kBlockSize] = cls.kDeltaBlockSize
+        data[cls.kBlockHashes] = weights.block_hashes(cls.kDeltaBlockSize, dtype=dtype)
+        shape_data = dict(shape_data)
+
+        blocks = {cls.kInfluencesIDs: np.array(influences_ids, dtype=np.int32),
+                  cls.kBindMatrix: bind_matrix.astype(np.float64)}
+        for key, block in weights.to_blocks(dtype=dtype).items():
+            blocks[f"{cls.kWeights}.{key}"] = block
+        for key, block_type in zip(cls.kShapeBlocks, cls.kShapeBlockTypes):
+            if key in shape_data:
+                blocks[f"{cls.kShapeData}.{key}"] = np.array(shape_data.pop(key), dtype=block_type)
+        data[cls.kShapeData] = shape_data
+
+        return data, blocks
+
+    def to_blocks(self, dtype: type = np.float32) -> tuple:
+        """!@Brief Get skin data as json header and numpy blocks for binary file."""
+        return self.build_blocks(*self.snapshot(), dtype=dtype)
+
+    def save(self, output_path: str, binary: bool = True, dtype: type = np.float32, delta: bool = False):
+        """!@Brief Save skin. Binary file by default, json file for legacy pipeline.
+                   With delta only vertex blocks changed since last save are appended to patch file.
+        """
+        if not binary:
+            return super().save(output_path)
+
+        if self.is_empty():
+            raise Exception(f"Data of {self.__class__.__name__} instance is empty !")
+
+        if delta and self._save_delta(output_path, dtype=dtype):
+            return
+
+        data, blocks = self.to_blocks(dtype=dtype)
+        self.write_blocks(output_path, data, blocks)
+        log.debug(f"{self.__class__.__name__} file write -> {output_path}")
+
+    def _save_delta(self, output_path: str, dtype: type = np.float32) -> bool:
+        """!@Brief Append changed vertex blocks to patch file. Return False if a full save is needed."""
+        saved = self._saved_state(output_path)
+        if saved is None:
+            return False
+
+        self._update_data()
+        block_size = saved[self.kBlockSize]
+        header = self._header()
+        if saved.get(self.kVertexCount) != self._weights.vertex_count or \
+           saved.get(self.kInfluencesNames) != header[self.kInfluencesNames]:
+            return False
+
+        hashes = self._weights.block_hashes(block_size, dtype=dtype)
+        changed = [i for i, (new, old) in enumerate(zip(hashes, saved[self.kBlockHashes])) if new != old]
+        header = json.loads(json.dumps(header))
+        settings_changed = any(saved.get(k) != v for k, v in header.items())
+        if not changed and not settings_changed:
+            log.debug(f"{self.__class__.__name__} no change since last save -> {output_path}")
+            return True
+
+        header[self.kBlockSize] = block_size
+        header[self.kBlockIds] = changed
+        header[self.kBlockHashes] = [hashes[i] for i in changed]
+        weights = SparseWeights.concatenate([self._weights.slice(i * block_size, (i + 1) * block_size)
+                                             for i in changed])
+        blocks = {f"{self.kWeights}.{k}": v for k, v in weights.to_blocks(dtype=dtype).items()}
+        binaryFile.append(self.patch_path(output_path), header, blocks)
+        log.debug(f"{self.__class__.__name__} {len(changed)} blocks append -> {self.patch_path(output_path)}")
+
+        return True
@@ -0,0 +1,205 @@
+from __future__ import annotations
+import hashlib
+from typing import Optional
+
+import numpy as np
+
+
+class SparseWeights(object):
+
+    """!@Brief Compressed sparse row skin weights.
+               One row per vertex, column indices are influence indices (not logical ids).
+    """
+
+    kIndptr = "indptr"
+    kIndices = "indices"
+    kValues = "values"
+
+    def __init__(self, indptr: Optional[np.ndarray] = None, indices: Optional[np.ndarray] = None,
+                 values: Optional[np.ndarray] = None, influence_count: int = 0):
+        self._indptr = np.zeros(1, dtype=np.int64) if indptr is None else np.asarray(indptr)
+        self._indices = np.zeros(0, dtype=np.int32) if indices is None else np.asarray(indices)
+        self._values = np.zeros(0, dtype=np.float64) if values is None else np.asarray(values)
+        self._influence_count = int(influence_count)
+
+        if len(self._indptr) == 0 or self._indptr[-1] != len(self._indices) or len(self._indices) != len(self._values):
+            raise ValueError("Invalid sparse weights data !")
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(vertices: {self.vertex_count}, influences: {self.influence_count}, nnz: {self.nnz})"
+
+    def __len__(self) -> int:
+        return self.vertex_count
+
+    @property
+    def indptr(self) -> np.ndarray:
+        return self._indptr
+
+    @property
+    def indices(self) -> np.ndarray:
+        return self._indices
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._values
+
+    @property
+    def vertex_count(self) -> int:
+        return len(self._indptr) - 1
+
+    @property
+    def influence_count(self) -> int:
+        return self._influence_count
+
+    @property
+    def nnz(self) -> int:
+        return len(self._values)
+
+    def is_empty(self) -> bool:
+        return self.vertex_count == 0
+
+    def counts(self, tolerance: Optional[float] = None) -> np.ndarray:
+        """!@Brief Weight count per vertex. Count stored weights or weights above tolerance."""
+        if tolerance is None:
+            return np.diff(self._indptr)
+        return np.bincount(self.row_ids()[self._values > tolerance], minlength=self.vertex_count)
+
+    def row_ids(self) -> np.ndarray:
+        """!@Brief Vertex index of each stored weight."""
+        return np.repeat(np.arange(self.vertex_count), self.counts())
+
+    @classmethod
+    def from_dense(cls, weights, influence_count: Optional[int] = None, tolerance: float = 0.0) -> SparseWeights:
+        """!@Brief Build from dense weights. Flat array (MDoubleArray) need influence_count."""
+        if not isinstance(weights, np.ndarray):
+            weights = np.fromiter(weights, dtype=np.float64, count=len(weights))
+        if influence_count is None:
+            if weights.ndim != 2:
+                raise ValueError("Influence count is needed with flat weights !")
+            influence_count = weights.shape[1]
+        weights = weights.reshape(-1, influence_count) if influence_count else weights.reshape(-1, 0)
+
+        mask = np.abs(weights) > tolerance
+        rows, cols = np.nonzero(mask)
+        indptr = np.zeros(weights.shape[0] + 1, dtype=np.int64)
+        np.cumsum(np.count_nonzero(mask, axis=1), out=indptr[1:])
+
+        return cls(indptr, cols.astype(np.int32), np.asarray(weights[rows, cols]), influence_count)
+
+    def to_dense(self, dtype: type = np.float64) -> np.ndarray:
+        """!@Brief Get dense (vertex, influence) array."""
+        dense = np.zeros((self.vertex_count, self._influence_count), dtype=dtype)
+        dense[self.row_ids(), self._indices] = self._values
+
+        return dense
+
+    @classmethod
+    def from_top_k(cls, indices: np.ndarray, values: np.ndarray, influence_count: int) -> SparseWeights:
+        """!@Brief Build from fixed width (vertex, k) arrays. Empty slots have index -1."""
+        indices = np.asarray(indices)
+        values = np.asarray(values)
+        mask = (indices >= 0) & (values != 0.0)
+        indptr = np.zeros(indices.shape[0] + 1, dtype=np.int64)
+        np.cumsum(np.count_nonzero(mask, axis=1), out=indptr[1:])
+
+        return cls(indptr, indices[mask].astype(np.int32), values[mask], influence_count)
+
+    def to_top_k(self, k: int) -> tuple:
+        """!@Brief Get fixed width (vertex, k) index and value arrays, keep the k biggest weights per vertex.
+                   Empty slots have index -1 and weight 0.0.
+        """
+        rows = self.row_ids()
+        order = np.lexsort((-self._values, rows))
+        rank = np.arange(self.nnz) - self._indptr[rows[order]]
+        keep = rank < k
+
+        indices = np.full((self.vertex_count, k), -1, dtype=np.int32)
+        values = np.zeros((self.vertex_count, k), dtype=self._values.dtype)
+        indices[rows[order][keep], rank[keep]] = self._indices[order][keep]
+        values[rows[order][keep], rank[keep]] = self._values[order][keep]
+
+        return indices, values
+
+    def rows(self, vertex_ids) -> SparseWeights:
+        """!@Brief Get sub weights of given vertices."""
+        vertex_ids = np.asarray(vertex_ids, dtype=np.int64)
+        starts = self._indptr[vertex_ids]
+        counts = self._indptr[vertex_ids + 1] - starts
+        indptr = np.zeros(len(vertex_ids) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        positions = np.repeat(starts - indptr[:-1], counts) + np.arange(indptr[-1])
+
+        return SparseWeights(indptr, self._indices[positions], self._values[positions], self._influence_count)
+
+    def slice(self, start: int, end: int) -> SparseWeights:
+        """!@Brief Get sub weights of contiguous vertices without copy."""
+        end = min(end, self.vertex_count)
+        first, last = self._indptr[start], self._indptr[end]
+
+        return SparseWeights(self._indptr[start:end + 1] - first, self._indices[first:last],
+                             self._values[first:last], self._influence_count)
+
+    @classmethod
+    def concatenate(cls, weights: list) -> SparseWeights:
+        """!@Brief Stack sparse weights of contiguous vertex chunks."""
+        if not weights:
+            return cls()
+
+        offsets = np.cumsum([0] + [x.nnz for x in weights[:-1]])
+        indptr = np.concatenate([[0]] + [x.indptr[1:] + offset for x, offset in zip(weights, offsets)])
+
+        return cls(indptr.astype(np.int64), np.concatenate([x.indices for x in weights]),
+                   np.concatenate([x.values for x in weights]), weights[0].influence_count)
+
+    def block_count(self, block_size: int) -> int:
+        return (self.vertex_count + block_size - 1) // block_size
+
+    def block_hashes(self, block_size: int, dtype: type = np.float32) -> list:
+        """!@Brief Content hash of each vertex block, values are hashed like they are stored (dtype)."""
+        output = []
+        for i in range(self.block_count(block_size)):
+            block = self.slice(i * block_size, (i + 1) * block_size)
+            content = hashlib.blake2b(digest_size=16)
+            content.update(block.indptr.astype(np.int64).tobytes())
+            content.update(block.indices.astype(np.int32).tobytes())
+            content.update(block.values.astype(dtype).tobytes())
+            output.append(content.hexdigest())
+
+        return output
+
+    def replace_blocks(self, block_size: int, block_ids: list, weights: SparseWeights) -> SparseWeights:
+        """!@Brief Get new weights where given vertex blocks are replaced.
+                   weights contains the rows of all given blocks, in block_ids order.
+        """
+        patches = {}
+        start = 0
+        for block_id in block_ids:
+            count = min(block_size, self.vertex_count - block_id * block_size)
+            patches[block_id] = weights.slice(start, start + count)
+            start += count
+
+        blocks = []
+        for i in range(self.block_count(block_size)):
+            blocks.append(patches[i] if i in patches else self.slice(i * block_size, (i + 1) * block_size))
+
+        return SparseWeights.concatenate(blocks)
+
+    def column(self, influence: int) -> np.ndarray:
+        """!@Brief Get dense weights of one influence for all vertices."""
+        output = np.zeros(self.vertex_count, dtype=self._values.dtype)
+        mask = self._indices == influence
+        output[self.row_ids()[mask]] = self._values[mask]
+
+        return output
+
+    def to_blocks(self, dtype: type = np.float32) -> dict:
+        return {self.kIndptr: self._indptr.astype(np.int64),
+                self.kIndices: self._indices.astype(np.int32),
+                self.kValues: self._values.astype(dtype)}
+
+    @classmethod
+    def from_blocks(cls, blocks: dict, influence_count: int) -> SparseWeights:
+        return cls(blocks[cls.kIndptr], blocks[cls.kIndices], blocks[cls.kValues], influence_count)
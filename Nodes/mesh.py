@@ -2,6 +2,9 @@ from __future__ import annotations
 from dataclasses import asdict, dataclass, field
 from functools import partial
 from typing import Optional
+import weakref
+
+import numpy as np
 
 from maya import cmds
 from maya.api import OpenMaya
@@ -9,6 +12,7 @@ from maya.api import OpenMaya
 from ..Helpers import point, utils
 
 from ..Core import constants, _factory
+from ..Core.signal import Signal
 from .dagNode import DAGNode
 from .shape import Shape
 
@@ -28,6 +32,14 @@ class UV(object):
         return asdict(self)
 
 
+def _topology_changed(node: OpenMaya.MObject, mesh_ref: weakref.ref):
+    mesh = mesh_ref()
+    if mesh is None:
+        OpenMaya.MMessage.removeCallback(OpenMaya.MMessage.currentCallbackId())
+        return
+    mesh.topology_changed.emit()
+
+
 @_factory.register()
 class Mesh(Shape):
 
@@ -38,6 +50,26 @@ class Mesh(Shape):
         self._mit_vtx = OpenMaya.MItMeshVertex(self._path)
         self._mit_poly = OpenMaya.MItMeshPolygon(self._path)
         self._modifier = OpenMaya.MDagModifier()
+        self._complete_component = None
+        self._complete_count = 0
+        self.topology_changed = Signal()
+        self.topology_changed.register(self._on_topology_changed)
+        self._topology_callback_id = OpenMaya.MPolyMessage.addPolyTopologyChangedCallback(self.object,
+                                                                                          _topology_changed,
+                                                                                          weakref.ref(self))
+
+    def __del__(self):
+        self.remove_callback()
+
+    def remove_callback(self):
+        """!@Brief Stop topology change tracking."""
+        callback_id = getattr(self, "_topology_callback_id", None)
+        if callback_id is not None:
+            try:
+                OpenMaya.MMessage.removeCallback(callback_id)
+            except RuntimeError:
+                pass
+            self._topology_callback_id = None
     
     def points(self, world: bool = True, normalize: bool = False,
                vertex_ids: Optional[list] = None) -> OpenMaya.MPointArray:
@@ -82,15 +114,30 @@ class Mesh(Shape):
             v = OpenMaya.MFloatArray(uv.v)
             self._mfn.setUVs(u, v, uv.name)
 
-    def components(self) -> OpenMaya.MObject:
+    def _on_topology_changed(self, *args):
+        self._complete_component = None
+
+    def components(self, vertex_ids: Optional[list | range | np.ndarray] = None) -> OpenMaya.MObject:
+        """!@Brief Get vertex component. Without vertex ids get the cached complete component of the mesh."""
+        if vertex_ids is None:
+            return self.complete_component()
+
         single_component = OpenMaya.MFnSingleIndexedComponent()
         component = single_component.create(OpenMaya.MFn.kMeshVertComponent)
-        self._mit_vtx.reset()
-        while not self._mit_vtx.isDone():
-            single_component.addElement(self._mit_vtx.index())
-            self._mit_vtx.next()
+        single_component.addElements(np.asarray(vertex_ids, dtype=np.int32).ravel().tolist())
 
         return component
+
+    def complete_component(self) -> OpenMaya.MObject:
+        """!@Brief Get complete vertex component, rebuilt only when topology change."""
+        vertex_count = self._mfn.numVertices
+        if self._complete_component is None or self._complete_count != vertex_count:
+            single_component = OpenMaya.MFnSingleIndexedComponent()
+            self._complete_component = single_component.create(OpenMaya.MFn.kMeshVertComponent)
+            single_component.setCompleteData(vertex_count)
+            self._complete_count = vertex_count
+
+        return self._complete_component
     
     def to_dict(self, normalize: bool = True) -> dict:
         data = {}
@@ -2,7 +2,13 @@
 
 from __future__ import annotations
 from contextlib import contextmanager
+from dataclasses import dataclass
+import hashlib
 import logging
+import os
+from pathlib import Path
+import re
+import tempfile
 import time
 from typing import Optional
 
@@ -156,10 +162,17 @@ class Skin(Node):
     def influence_names(self) -> np.array:
         return [x.fullPathName() for x in self._influences_path]
     
-    def get_joint_matrices(self) -> np.array:
+    def get_joint_matrices(self, frame: Optional[float] = None) -> np.array:
+        """!@Brief Get influence world matrices at current time or evaluated at frame (see FrameContext)."""
         matrices = []
         for i in range(self.influence_count):
-            marix = self._influences_path[i].inclusiveMatrix()
+            if frame is None:
+                marix = self._influences_path[i].inclusiveMatrix()
+            else:
+                path = self._influences_path[i]
+                plug = om.MFnDagNode(path).findPlug("worldMatrix", False).elementByLogicalIndex(path.instanceNumber())
+                with FrameContext(frame):
+                    marix = om.MFnMatrixData(plug.asMObject()).matrix()
             matrices.append(np.array(marix).reshape(4, 4))
         
         return np.array(matrices)
@@ -183,6 +196,13 @@ def KeepTime():
         cmds.currentTime(current_time)
 
 
+@contextmanager
+def FrameContext(frame: float):
+    """!@Brief Evaluate plugs at frame (ui unit) without changing the current time."""
+    with om.MDGContextGuard(om.MDGContext(om.MTime(frame, om.MTime.uiUnit()))):
+        yield
+
+
 @contextmanager
 def SuspendRefresh():
     cmds.refresh(suspend=True)
@@ -256,6 +276,123 @@ def get_points(obj: str | om.MDagPath | om.MObject):
     return points
 
 
+def get_points_at(obj: str | om.MDagPath | om.MObject, frame: float) -> np.ndarray:
+    """!@Brief Get object space points (V, 3) of mesh evaluated at frame, without changing the current time."""
+    path = obj if isinstance(obj, om.MDagPath) else get_path(obj)
+    if not path.node().hasFn(om.MFn.kMesh):
+        path = om.MDagPath(path).extendToShape()
+    plug = om.MFnDagNode(path).findPlug("outMesh", False)
+    with FrameContext(frame):
+        data = plug.asMObject()
+
+    return np.array(om.MFnMesh(data).getPoints(om.MSpace.kObject))[:, :3]
+
+
+kCacheFileAttributes = {"AlembicNode": ("abc_File",),
+                        "cacheFile": ("cachePath", "cacheName"),
+                        "gpuCache": ("cacheFileName",)}
+
+
+def cache_files(mo: om.MObject) -> list:
+    """!@Brief Get file paths of alembic, geometry and nCloth caches upstream of node (nCache use cacheFile)."""
+    output = []
+    for node in harvest(mo, om.MFn.kInvalid):
+        mfn = om.MFnDependencyNode(node)
+        attributes = kCacheFileAttributes.get(mfn.typeName)
+        if attributes is None:
+            continue
+        values = [mfn.findPlug(x, False).asString() for x in attributes]
+        if mfn.typeName == "cacheFile":
+            values = [os.path.join(values[0], f"{values[1]}.xml")]
+        output.extend(x for x in values if x)
+
+    return output
+
+
+def scene_hash(obj: str | om.MObject) -> str:
+    """!@Brief Hash of scene file, time unit, keys of all animation curves and cache files upstream of node.
+               Files are hashed with their modification time, a re-exported cache or saved scene change the hash.
+    """
+    mo = obj if isinstance(obj, om.MObject) else get_object(obj)
+    content = hashlib.blake2b(digest_size=8)
+    scene = cmds.file(query=True, sceneName=True)
+    content.update((scene or "untitled").encode())
+    if scene and os.path.exists(scene):
+        content.update(str(os.path.getmtime(scene)).encode())
+    content.update(str(om.MTime.uiUnit()).encode())
+    for curve in harvest(mo, om.MFn.kAnimCurve):
+        mfn = oma.MFnAnimCurve(curve)
+        inputs = [mfn.unitlessInput(i) if mfn.isUnitlessInput else mfn.input(i).value for i in range(mfn.numKeys)]
+        keys = [(x, mfn.value(i)) for i, x in enumerate(inputs)]
+        content.update(mfn.name().encode())
+        content.update(np.array(keys, dtype=np.float64).tobytes())
+    for path in cache_files(mo):
+        content.update(path.encode())
+        if os.path.exists(path):
+            content.update(str(os.path.getmtime(path)).encode())
+
+    return content.hexdigest()
+
+
+class PointCache:
+
+    """!@Brief Memory mapped (T, V, 3) float64 .npy points of a mesh over frames.
+               File name is keyed on mesh name, frame range and scene hash, so a cache is only reused
+               while the animation driving the mesh does not change.
+    """
+
+    kExtension = ".npy"
+    kPartial = ".partial"
+
+    def __init__(self, mesh: str, frames: np.ndarray, directory: Optional[str | Path] = None):
+        self._mesh = mesh
+        self._frames = np.asarray(frames, dtype=np.float64)
+        self._directory = Path(directory) if directory else Path(tempfile.gettempdir()) / "ssdr_cache"
+        key = re.sub(r"[^\w]+", "_", name(get_object(mesh), full=False)).strip("_")
+        frame_key = f"{self._frames[0]:g}_{self._frames[-1]:g}_{len(self._frames)}" if len(self._frames) else "0"
+        self._path = self._directory / f"{key}_{frame_key}_{scene_hash(mesh)}{self.kExtension}"
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(mesh: {self._mesh}, frames: {len(self._frames)}, path: {self._path})"
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def exists(self) -> bool:
+        return self._path.exists()
+
+    def load(self) -> np.ndarray:
+        return np.load(self._path, mmap_mode="r")
+
+    def sample(self) -> np.ndarray:
+        """!@Brief Evaluate mesh at each frame and stream points to disk.
+                   Points are written to a partial file renamed at the end, an aborted sampling leave no cache.
+        """
+        self._directory.mkdir(parents=True, exist_ok=True)
+        path = get_path(self._mesh)
+        first = get_points_at(path, self._frames[0])
+        partial = self._path.with_suffix(self.kPartial + self.kExtension)
+        output = np.lib.format.open_memmap(partial, mode="w+", dtype=np.float64,
+                                           shape=(len(self._frames), len(first), 3))
+        output[0] = first
+        for t in range(1, len(self._frames)):
+            output[t] = get_points_at(path, self._frames[t])
+        output.flush()
+        del output
+        os.replace(partial, self._path)
+        log.debug(f"Point cache write -> {self._path}")
+
+        return self.load()
+
+    def get(self, refresh: bool = False) -> np.ndarray:
+        """!@Brief Get cached points, sample them if cache does not exist or refresh."""
+        if not refresh and self.exists():
+            log.debug(f"Point cache read <- {self._path}")
+            return self.load()
+        return self.sample()
+
+
 def solve_nnls(A, b):
     x, _ = nnls(A, b)
     x[x < 1e-4] = 0
@@ -266,14 +403,107 @@ def solve_nnls(A, b):
     return x
 
 
+def normalize_weights(weights: np.ndarray) -> np.ndarray:
+    """!@Brief Same clean as solve_nnls for (V, B) weights."""
+    weights[weights < 1e-4] = 0
+    sums = np.sum(weights, axis=1)
+    valid = sums > 1e-8
+    weights[valid] /= sums[valid, None]
+
+    return weights
+
+
+def top_k(values: np.ndarray, k: int) -> np.ndarray:
+    """!@Brief Get column ids (N, k) of the k biggest values of each row, not sorted."""
+    if k >= values.shape[1]:
+        return np.broadcast_to(np.arange(values.shape[1]), values.shape).copy()
+    return np.argpartition(-values, k - 1, axis=1)[:, :k]
+
+
+def solve_nnls_subset(gram: np.ndarray, rhs: np.ndarray, ids: np.ndarray) -> np.ndarray:
+    """!@Brief Solve normalized NNLS weights (N, k) restricted to columns ids (N, k) of gram (N, B, B) / rhs (N, B)."""
+    sub_gram = np.take_along_axis(np.take_along_axis(gram, ids[:, :, None], axis=1), ids[:, None, :], axis=2)
+    sub_rhs = np.take_along_axis(rhs, ids, axis=1)
+
+    return normalize_weights(solve_nnls_batched(sub_gram, sub_rhs))
+
+
+def _solve_passive(gram: np.ndarray, rhs: np.ndarray, passive: np.ndarray) -> np.ndarray:
+    """!@Brief Solve gram[P, P] x[P] = rhs[P] for each row passive set P, x is 0 out of P."""
+    both = passive[:, :, None] & passive[:, None, :]
+    matrices = np.where(both, gram, 0.0)
+    diagonal = np.arange(gram.shape[-1])
+    matrices[:, diagonal, diagonal] += np.where(passive, 1e-12, 1.0)
+
+    return np.linalg.solve(matrices, np.where(passive, rhs, 0.0)[..., None])[..., 0]
+
+
+def solve_nnls_batched(gram: np.ndarray, rhs: np.ndarray, max_iterations: Optional[int] = None,
+                       tolerance: float = 1e-10) -> np.ndarray:
+    """!@Brief Batched active set NNLS (Lawson-Hanson on normal equations, see Bro & De Jong FNNLS).
+               gram (N, B, B) = A^T A, rhs (N, B) = A^T b. Each row is solved with its own passive set,
+               rows are removed from the batch when they converge.
+    """
+    count, size = rhs.shape
+    max_iterations = max_iterations or 3 * size
+    x = np.zeros((count, size))
+    passive = np.zeros((count, size), dtype=bool)
+    gradient = rhs.copy()
+    active = np.arange(count)
+    for _ in range(max_iterations):
+        candidates = np.where(passive[active], -np.inf, gradient[active])
+        best = np.argmax(candidates, axis=1)
+        keep = candidates[np.arange(len(active)), best] > tolerance
+        active, best = active[keep], best[keep]
+        if len(active) == 0:
+            break
+        passive[active, best] = True
+
+        sub_gram, sub_rhs, sub_passive, sub_x = gram[active], rhs[active], passive[active], x[active]
+        solution = _solve_passive(sub_gram, sub_rhs, sub_passive)
+        for _ in range(size):
+            infeasible = sub_passive & (solution <= tolerance)
+            rows = np.flatnonzero(infeasible.any(axis=1))
+            if len(rows) == 0:
+                break
+            step = np.maximum(sub_x[rows] - solution[rows], 1e-300)
+            alpha = np.where(infeasible[rows], sub_x[rows] / step, np.inf).min(axis=1)[:, None]
+            sub_x[rows] += alpha * (solution[rows] - sub_x[rows])
+            sub_passive[rows] &= sub_x[rows] > tolerance
+            solution[rows] = _solve_passive(sub_gram[rows], sub_rhs[rows], sub_passive[rows])
+
+        sub_x = np.where(sub_passive, solution, 0.0)
+        x[active] = sub_x
+        passive[active] = sub_passive
+        gradient[active] = sub_rhs - np.einsum("vij,vj->vi", sub_gram, sub_x)
+
+    return x
+
+
+@dataclass
+class ReconstructionError:
+
+    prediction: np.ndarray
+    total: float
+    rms: np.ndarray
+    max: np.ndarray
+
+    def __str__(self) -> str:
+        return f"error: {self.total:.6f}, rms: {np.max(self.rms):.6f}, max: {np.max(self.max):.6f}"
+
+
 # ----------------------------------------------------------------
 # API Utils
 # ----------------------------------------------------------------
 
 class SSDR:
 
+    kMaxElements = 1 << 24
+
     def __init__(self, src_mesh: str, dst_mesh: str, start_frame: Optional[int] = None, end_frame: Optional[int] = None,
-                 max_itererations: int = 30, tolerence: float = 1e-4, reinit_threshold: float = 1e-6):
+                 max_itererations: int = 30, tolerence: float = 1e-4, reinit_threshold: float = 1e-6,
+                 cache_directory: Optional[str] = None, sparse: bool = False,
+                 candidate_count: Optional[int] = None, use_cache: bool = True):
         self._src_mesh = src_mesh
         self._dst_mesh = dst_mesh
         self._dst_skin = Skin.find(self._dst_mesh)
@@ -282,16 +512,25 @@ class SSDR:
 
         self._start_frame = start_frame
         self._end_frame = end_frame
+        self._frames = None
+        self._cache_directory = cache_directory
+        self._use_cache = use_cache
         self._rest_pose = []
         self._poses = []
         self._num_pose = 0
         self._num_vertices = 0
         self._num_bones = 0
         self._max_influences = 0
+        self._sparse = sparse
+        self._candidate_count = candidate_count
         self._max_itererations = max_itererations
         self._tolerence = tolerence
         self.reinit_threshold = reinit_threshold
         self._weights = None
+        self._influence_ids = None
+        self._influence_weights = None
+        self._bone_positions = None
+        self._error_history = []
         self._transforms = None
         self._pose_transforms = None
         self._rest_transforms = None
@@ -308,87 +547,199 @@ class SSDR:
         if self._end_frame is None:
             self._end_frame = cmds.playbackOptions(query=True, max=True)
         self._num_pose = int(self._end_frame - self._start_frame)
+        self._frames = self._start_frame + np.arange(self._num_pose, dtype=np.float64)
 
     def _get_data(self):
-        cmds.currentTime(self._start_frame)
-        joint_matrices = np.array(self._dst_skin.get_joint_matrices())
+        joint_matrices = np.array(self._dst_skin.get_joint_matrices(frame=self._start_frame))
 
-        poses = []
-        with SuspendRefresh():
-            with KeepTime():
-                for t in range(0, self._num_pose):
-                    cmds.currentTime(t)
-                    poses.append(get_points(self._src_mesh))
+        with GiveTime("Get poses"):
+            points = PointCache(self._src_mesh, self._frames, self._cache_directory).get(
+                refresh=not self._use_cache)
 
-        self._poses = np.array(poses)
+        self._poses = np.concatenate([points, np.ones((self._num_pose, points.shape[1], 1))], axis=2)
         self._rest_pose = self._poses[0].copy()
         self._num_vertices = len(self._rest_pose)
         self._num_bones = self._dst_skin.influence_count
-        self._max_influences = self._dst_skin.max_influences
+        max_influences = self._dst_skin.max_influences
+        self._max_influences = min(max_influences, self._num_bones) if max_influences > 0 else self._num_bones
+        self._candidate_count = min(max(self._candidate_count or 2 * self._max_influences, self._max_influences),
+                                    self._num_bones)
+        self._bone_positions = joint_matrices[:, 3, :3]
         self._transforms = np.repeat(np.expand_dims(joint_matrices, axis=0), self._num_pose, axis=0)
-        self._rest_transforms = [np.linalg.inv(x) for x in joint_matrices.copy()]
+        self._rest_transforms = np.linalg.inv(joint_matrices)
         self._weights = np.zeros((self._num_vertices, self._num_bones))
 
+    def skinning_matrices(self) -> np.ndarray:
+        """!@Brief Get rest_transforms[i] @ transforms[t, i] (T, B, 4, 4), same for every vertex."""
+        return np.matmul(self._rest_transforms[None], self._transforms)
+
+    @property
+    def influence_ids(self) -> Optional[np.ndarray]:
+        """!@Brief Bone ids (V, max influences) of last weights, -1 for empty slots."""
+        return self._influence_ids
+
+    @property
+    def influence_weights(self) -> Optional[np.ndarray]:
+        """!@Brief Weights (V, max influences) of influence_ids."""
+        return self._influence_weights
+
+    def _set_top_k(self, start: int, bone_ids: np.ndarray, weights: np.ndarray):
+        """!@Brief Store fixed width weights of vertices [start, start + N) and scatter them in dense weights."""
+        end = start + len(bone_ids)
+        if self._influence_ids is None:
+            self._influence_ids = np.full((self._num_vertices, self._max_influences), -1, dtype=np.int64)
+            self._influence_weights = np.zeros((self._num_vertices, self._max_influences))
+        bone_ids = np.where(weights > 0.0, bone_ids, -1)
+        self._influence_ids[start:end] = bone_ids
+        self._influence_weights[start:end] = weights
+
+        rows, slots = np.nonzero(bone_ids >= 0)
+        self._weights[start:end] = 0.0
+        self._weights[start + rows, bone_ids[rows, slots]] = weights[rows, slots]
+
+    def candidates(self, start: int, end: int) -> np.ndarray:
+        """!@Brief Get candidate bones (N, candidate count) of vertices [start, end).
+                   Bones of previous weights come first, remaining slots take the nearest bones in rest pose.
+        """
+        rest = self._rest_pose[start:end, :3]
+        distances = np.sum((rest[:, None, :] - self._bone_positions[None]) ** 2, axis=2)
+        if self._influence_ids is not None:
+            previous = self._influence_ids[start:end]
+            rows, slots = np.nonzero(previous >= 0)
+            distances[rows, previous[rows, slots]] = -1.0
+
+        return top_k(-distances, self._candidate_count)
+
     def update_weights(self):
-        for v in range(self._num_vertices):
-            A = []
-            for t in range(self._num_pose):
-                point = self._rest_pose[v]
-                joint_transformations = [self._rest_transforms[i] @ j for i, j in enumerate(self._transforms[t])]
-                A.append(np.array([point @ joint for joint in joint_transformations]).T)
+        """!@Brief Solve all vertex weights.
+                   Design matrix of vertex v is A_v[(t, c), i] = (p_v @ M_ti)[c], it is contracted with einsum
+                   directly to normal equations A_v^T A_v and A_v^T b_v, then solved with the batched NNLS.
+                   Weights are clamped to max influences: the NNLS is solved again on the biggest bones.
+        """
+        if self._sparse:
+            self._update_weights_sparse()
+            return
 
-            A = np.vstack(A)
-            b = np.hstack(self._poses[:, v])
-            weights = solve_nnls(A, b)
-            # ToDo: Clamp with max influences
-            self._weights[v] = weights
+        matrices = self.skinning_matrices()
+        products = np.einsum("tikc,tjlc->ijkl", matrices, matrices, optimize=True)
+        chunk = max(1, self.kMaxElements // (self._num_pose * self._num_bones * 4))
+        for start in range(0, self._num_vertices, chunk):
+            rest = self._rest_pose[start:start + chunk]
+            gram = np.einsum("vk,ijkl,vl->vij", rest, products, rest, optimize=True)
+            rhs = np.einsum("vk,tikc,tvc->vi", rest, matrices, self._poses[:, start:start + chunk], optimize=True)
+            weights = normalize_weights(solve_nnls_batched(gram, rhs))
+            bone_ids = top_k(weights, self._max_influences)
+            if self._max_influences < self._num_bones:
+                weights = solve_nnls_subset(gram, rhs, bone_ids)
+            else:
+                weights = np.take_along_axis(weights, bone_ids, axis=1)
+            self._set_top_k(start, bone_ids, weights)
+
+    def _update_weights_sparse(self):
+        """!@Brief Solve vertex weights on candidate bones only (see candidates).
+                   Normal equations are built from gathered candidate matrices, so the cost scale with
+                   the candidate count instead of the bone count.
+        """
+        matrices = self.skinning_matrices()
+        products = np.einsum("tikc,tjlc->ijkl", matrices, matrices, optimize=True)
+        chunk = max(1, self.kMaxElements // (self._num_pose * self._candidate_count * 16))
+        for start in range(0, self._num_vertices, chunk):
+            end = min(start + chunk, self._num_vertices)
+            bones = self.candidates(start, end)
+            rest = self._rest_pose[start:end]
+            pair_products = products[bones[:, :, None], bones[:, None, :]]
+            gram = np.einsum("vk,vijkl,vl->vij", rest, pair_products, rest, optimize=True)
+            rhs = np.einsum("vk,tvikc,tvc->vi", rest, matrices[:, bones], self._poses[:, start:end], optimize=True)
+
+            weights = normalize_weights(solve_nnls_batched(gram, rhs))
+            slots = top_k(weights, self._max_influences)
+            if self._max_influences < self._candidate_count:
+                weights = solve_nnls_subset(gram, rhs, slots)
+            else:
+                weights = np.take_along_axis(weights, slots, axis=1)
+            self._set_top_k(start, np.take_along_axis(bones, slots, axis=1), weights)
 
     def update_bones(self):
-        for t in range(self._num_pose):
-            for j in range(self._num_bones):
-                weights = self._weights[:, j]
-                if np.sum(weights**2) < self.reinit_threshold:
-                    self.reinitialize_bone(t, j)
-                    continue
-                weights_sum = np.sum(weights)
-                p_centroid = np.sum(weights[:, None] * self._rest_pose, axis=0) / weights_sum
-                v_centroid = np.sum(weights[:, None] * self._poses[t], axis=0) / weights_sum
-                p_centered = self._rest_pose - p_centroid
-                v_centered = self._poses[t] - v_centroid
-                C = (weights[:, None] * p_centered).T @ v_centered
-                U, S, Vt = np.linalg.svd(C)
-                R_opt = Vt.T @ U.T
-                if np.linalg.det(R_opt) < 0:
-                    Vt[-1, :] *= -1
-                    R_opt = Vt.T @ U.T
-                T_opt = v_centroid - R_opt @ p_centroid
-
-                transformation_matrix = np.eye(4)
-                transformation_matrix[:3, :3] = R_opt[:3, :3]
-                transformation_matrix[3, :3] = T_opt[:3]
-                self._transforms[t, j] = transformation_matrix
+        """!@Brief Fit rigid transforms of all (frame, bone) pairs.
+                   Weighted covariances are accumulated only on vertices with non zero weight (sorted by bone),
+                   then solved with one svd over the (T * B, 3, 3) stack.
+        """
+        rest = self._rest_pose[:, :3]
+        poses = self._poses[:, :, :3]
+        valid = np.sum(self._weights ** 2, axis=0) >= self.reinit_threshold
+
+        bones, vertices = np.nonzero(self._weights.T * valid[:, None] > 0.0)
+        values = self._weights[vertices, bones]
+        sums = np.sum(self._weights, axis=0)
+        sums[sums == 0.0] = 1.0
+        starts = np.flatnonzero(np.r_[True, bones[1:] != bones[:-1]]) if len(bones) else np.zeros(0, dtype=np.int64)
+        used = bones[starts]
+
+        weighted_rest = values[:, None] * rest[vertices]
+        p_centroid = np.zeros((self._num_bones, 3))
+        p_centroid[used] = np.add.reduceat(weighted_rest, starts, axis=0)
+        p_centroid /= sums[:, None]
+
+        v_centroid = np.zeros((self._num_pose, self._num_bones, 3))
+        covariance = np.zeros((self._num_pose, self._num_bones, 3, 3))
+        chunk = max(1, self.kMaxElements // (9 * max(len(values), 1)))
+        for start in range(0, self._num_pose if len(values) else 0, chunk):
+            frame_points = poses[start:start + chunk, vertices]
+            v_centroid[start:start + chunk, used] = np.add.reduceat(values[None, :, None] * frame_points,
+                                                                   starts, axis=1)
+            cross = weighted_rest[None, :, :, None] * frame_points[:, :, None, :]
+            covariance[start:start + chunk, used] = np.add.reduceat(cross, starts, axis=1)
+        v_centroid /= sums[None, :, None]
+        covariance -= sums[None, :, None, None] * p_centroid[None, :, :, None] * v_centroid[:, :, None, :]
+
+        U, S, Vt = np.linalg.svd(covariance.reshape(-1, 3, 3))
+        R_opt = np.matmul(np.swapaxes(Vt, 1, 2), np.swapaxes(U, 1, 2))
+        reflection = np.linalg.det(R_opt) < 0
+        Vt[reflection, -1, :] *= -1
+        R_opt[reflection] = np.matmul(np.swapaxes(Vt[reflection], 1, 2), np.swapaxes(U[reflection], 1, 2))
+        R_opt = R_opt.reshape(self._num_pose, self._num_bones, 3, 3)
+        T_opt = v_centroid - np.einsum("tjab,jb->tja", R_opt, p_centroid)
+
+        self._transforms[:, valid] = np.eye(4)
+        self._transforms[:, valid, :3, :3] = R_opt[:, valid]
+        self._transforms[:, valid, 3, :3] = T_opt[:, valid]
+        for j in np.flatnonzero(~valid):
+            for t in range(self._num_pose):
+                self.reinitialize_bone(t, j)
 
     def reinitialize_bone(self, t, j, neighbor_count=20):
         self._transforms[t, j] = kIdentityMatrix.copy()
 
-    def compute_error(self):
-        err = 0.0
-        for t in range(self._num_pose):
-            for v in range(self._num_vertices):
-                # Solve
-                pred = np.zeros(3)
-                for j in range(self._num_bones):
-                    # Transform matrix
-                    matrix = self._transforms[t, j].reshape(4, 4)
-                    rotation = matrix[:3, :3]
-                    translation = matrix[:, 3][:3]
-                    pred += self._weights[v, j] * (rotation @ self._rest_pose[v][:3] + translation)
-                err += np.linalg.norm(self._poses[t][v][:3] - pred)**2
-
-        return err
-
-    def run(self):
+    @property
+    def error_history(self) -> list:
+        """!@Brief ReconstructionError of each iteration of last run, without predictions."""
+        return self._error_history
+
+    def reconstruct(self, dtype: type = np.float64) -> np.ndarray:
+        """!@Brief Get predicted points (T, V, 3) = sum_j w_vj * (R_tj @ p_v + T_tj).
+                   Rotation is transforms[:3, :3] and translation the last row, like update_bones set them.
+        """
+        weights = self._weights.astype(dtype)
+        rotations = self._transforms[:, :, :3, :3].astype(dtype)
+        translations = self._transforms[:, :, 3, :3].astype(dtype)
+        rest = self._rest_pose[:, :3].astype(dtype)
+
+        prediction = np.einsum("vj,tjab,vb->tva", weights, rotations, rest, optimize=True)
+        prediction += np.einsum("vj,tja->tva", weights, translations, optimize=True)
+
+        return prediction
+
+    def compute_error(self, dtype: type = np.float64) -> ReconstructionError:
+        """!@Brief Get reconstruction error, total squared error and rms / max distance per frame."""
+        prediction = self.reconstruct(dtype=dtype)
+        squared = np.sum((self._poses[:, :, :3].astype(dtype) - prediction) ** 2, axis=2)
+
+        return ReconstructionError(prediction, float(np.sum(squared, dtype=np.float64)),
+                                   np.sqrt(np.mean(squared, axis=1)), np.sqrt(np.max(squared, axis=1)))
+
+    def run(self, dtype: type = np.float64):
         prev_err = np.inf
+        self._error_history = []
         for it in range(self._max_itererations):
             log.debug(f"Itération {it}...")
             log.debug("Compute Weights...")
@@ -396,8 +747,11 @@ class SSDR:
             log.debug("Compute Transforms...")
             self.update_bones()
             log.debug("Compute Errors...")
-            err = self.compute_error()
-            log.debug(f"Reconstruction Error : {err:.6f}")
+            error = self.compute_error(dtype=dtype)
+            error.prediction = None
+            self._error_history.append(error)
+            err = error.total
+            log.debug(f"Reconstruction {error}")
             if abs(prev_err - err) / (prev_err + 1e-8) < self._tolerence:
                 break
             prev_err = err
@@ -405,13 +759,14 @@ class SSDR:
     
     def set_skin_weights(self):
         with GiveTime("Set skin weights"):
+            # Dense weights are scattered from influence_ids, zero out of max influences.
             self._dst_skin.set_weights(self._weights.reshape(self._num_vertices * self._num_bones))
 
     def set_joint_transforms(self):
         with GiveTime("Set joint transforms"):
             with KeepTime():
-                for t in range(self._num_pose):
-                    cmds.currentTime(t)
+                for t, frame in enumerate(self._frames):
+                    cmds.currentTime(frame)
                     for j in range(self._num_bones):
                         jnt = self._dst_skin._influences_path[j].fullPathName()
                         cmds.xform(jnt, matrix=self._transforms[t, j].reshape(16), worldSpace=True)
@@ -2,6 +2,7 @@
 
 """
 !@Brief Load skin cluster from file.
+        Select shapes to load and optionally a joint, influences are resolved under its skeleton root.
 
 File Path: {s_path}
 """
@@ -16,7 +17,8 @@ except:
 
 from maya import cmds
 
-from ..Helpers.skin import Skin
+from ..Core import constants
+from ..Helpers.skin import InfluenceIndexCache, Skin
 from ..Ui import utils
 
 log = logging.getLogger('Load Skin')
@@ -29,10 +31,19 @@ kImage = None
 kScriptName = 'Load Skin'
 
 
-def _load_skin(node: str, file_path: str):
+def _skeleton_root(joint: str) -> str:
+    parents = cmds.listRelatives(joint, parent=True, fullPath=True, type="joint")
+    while parents:
+        joint = parents[0]
+        parents = cmds.listRelatives(joint, parent=True, fullPath=True, type="joint")
+
+    return joint
+
+
+def _load_skin(node: str, file_path: str, joint_root: str = None):
     
     try:
-        skin = Skin.read(file_path, shape_namespace=None, joint_namespace=None, joint_root=None)
+        skin = Skin.read(file_path, shape_namespace=None, joint_namespace=None, joint_root=joint_root)
         if not skin.shape:
             raise RuntimeError("No shape found !")
 
@@ -49,13 +60,17 @@ def _load_skin(node: str, file_path: str):
 
 def process(*args, **kwargs):
     title = "Select Skin File"
-    file_path, _ = QtWidgets.QFileDialog.getOpenFileName(utils.main_window(), title)
+    file_filter = f"Skin (*.{constants.kSkinExtension});;All Files (*)"
+    file_path, _ = QtWidgets.QFileDialog.getOpenFileName(utils.main_window(), title, filter=file_filter)
     if not file_path:
         return
 
-    selected = cmds.ls(selection=True, long=True) or []
-    for node in selected:
-        _load_skin(node, file_path)
+    joints = cmds.ls(selection=True, long=True, type="joint") or []
+    selected = [x for x in cmds.ls(selection=True, long=True) or [] if x not in joints]
+    joint_root = _skeleton_root(joints[0]) if joints else None
+    with InfluenceIndexCache():
+        for node in selected:
+            _load_skin(node, file_path, joint_root=joint_root)
 
 
 def main():
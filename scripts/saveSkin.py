@@ -8,8 +8,12 @@
 File Path: {s_path}
 """
 
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 import logging
 import os
+import time
 import traceback
 
 try:
@@ -35,21 +39,79 @@ kImage = None
 kScriptName = 'Save Skin'
 
 
-def _save_skin(node: str, directory: str):
+@dataclass
+class SaveReport(object):
+
+    node: str
+    file_path: str = ""
+    extract_time: float = 0.0
+    write_time: float = 0.0
+    size: int = 0
+    error: str = ""
+
+    def __str__(self) -> str:
+        if self.error:
+            return f"{self.node}: {self.error}"
+        return f"{self.node}: extract {self.extract_time:.3f}s, write {self.write_time:.3f}s, " \
+               f"{self.size / 1048576.0:.2f} Mo -> {self.file_path}"
+
+
+def _write(file_path: str, snapshot: tuple) -> tuple:
+    start = time.perf_counter()
+    data, blocks = Skin.build_blocks(*snapshot)
+    size = Skin.write_blocks(file_path, data, blocks)
+
+    return size, time.perf_counter() - start
+
+
+def _collect(report: SaveReport, future: Future):
     try:
-        skin = Skin.get(node)
-        if not skin:
-            log.debug(f"Node {node} does not have skin.")
-            return
-        short_name = node.split("|")[-1].split(":")[-1]
-        file_name = f"{short_name}.{constants.kSkinExtension}"
-        file_path = os.path.normpath(os.path.join(directory, file_name))
-        skin.save(file_path)
+        report.size, report.write_time = future.result()
     except Exception:
-        log.error(f"Error on save skin of {node} !")
+        report.error = f"Error on write {report.file_path} !"
+        log.error(report.error)
         log.error(traceback.format_exc())
 
 
+def save_skins(nodes: list, directory: str, max_workers: int = 4, max_pending: int = 8) -> list:
+    """!@Brief Save skin of given nodes.
+               Raw skin data are read on main thread, block encoding, hashing and file writing
+               are done by a thread pool. At most max_pending extracted skins wait for writing to bound memory.
+    """
+    reports = []
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for node in nodes:
+            report = SaveReport(node)
+            reports.append(report)
+            try:
+                start = time.perf_counter()
+                skin = Skin.get(node)
+                if not skin:
+                    report.error = "No skin found"
+                    log.debug(f"Node {node} does not have skin.")
+                    continue
+                snapshot = skin.snapshot()
+                report.extract_time = time.perf_counter() - start
+                short_name = node.split("|")[-1].split(":")[-1]
+                file_name = f"{short_name}.{constants.kSkinExtension}"
+                report.file_path = os.path.normpath(os.path.join(directory, file_name))
+            except Exception:
+                report.error = "Error on extract skin"
+                log.error(f"Error on save skin of {node} !")
+                log.error(traceback.format_exc())
+                continue
+
+            while len(pending) >= max_pending:
+                _collect(*pending.popleft())
+            pending.append((report, executor.submit(_write, report.file_path, snapshot)))
+
+        while pending:
+            _collect(*pending.popleft())
+
+    return reports
+
+
 def process(*args, **kwargs):
     title = "Select Skin Folder"
     directory = QtWidgets.QFileDialog.getExistingDirectory(utils.main_window(), title)
@@ -57,8 +119,8 @@ def process(*args, **kwargs):
         return
 
     selected = cmds.ls(selection=True, long=True) or []
-    for node in selected:
-        _save_skin(node, directory)
+    for report in save_skins(selected, directory):
+        log.info(str(report))
 
 
 def main():